@@ -0,0 +1,103 @@
+"""
+Benchmarks the lexer, parser and evaluators on generated workloads.
+
+    python -m benchmarks run [--scale N] [--repeat N] [--output results.json]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+
+The compare command exits with status 1 when any stage got slower or used
+more memory than the threshold allows.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks.runner import run_all
+from benchmarks.workloads import WORKLOADS, generate
+
+
+def run(args) -> int:
+    workloads = generate(args.scale, args.workload)
+    results = run_all(workloads, args.repeat)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    with open(args.current) as file:
+        current = json.load(file)["results"]
+
+    regressions = 0
+    for workload, stages in current.items():
+        for stage, timing in stages.items():
+            before = baseline.get(workload, {}).get(stage)
+            if not before or "seconds" not in before or "seconds" not in timing:
+                continue
+
+            for key in ("seconds", "peak_bytes"):
+                if not before[key]:
+                    continue
+                # Timings this small are dominated by noise
+                if key == "seconds" and max(before[key], timing[key]) < args.min_time:
+                    continue
+
+                ratio = timing[key] / before[key]
+                flag = ""
+                if ratio > 1 + args.threshold:
+                    flag = "  REGRESSION"
+                    regressions += 1
+                elif ratio < 1 - args.threshold:
+                    flag = "  improved"
+
+                print(f"{workload:>16} {stage:>10} {key:>10}: {ratio:6.2f}x{flag}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--scale", type=int, default=200)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument(
+        "--workload", action="append", choices=list(WORKLOADS), help="repeatable"
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.add_argument("--min-time", type=float, default=0.0005)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Compares the Interpreter's boxed path, which wraps every intermediate value
+in a Number and a RunTimeResult, with its unboxed path on raw values.
+
+    python -m benchmarks.allocations [--scale N] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.runner import make_context
+from benchmarks.workloads import generate
+from src.interpreter import Interpreter, RunTimeResult
+from src.lexer import Lexer
+from src.parser import Parser
+from src.values import Number
+
+COUNTED = (Number, RunTimeResult)
+
+
+def count_allocations(evaluate) -> int:
+    """Runs `evaluate` once, counting the Number and RunTimeResult objects made."""
+    count = 0
+    originals = [cls.__init__ for cls in COUNTED]
+
+    def counting(init):
+        def wrapper(*args, **kwargs):
+            nonlocal count
+            count += 1
+            init(*args, **kwargs)
+
+        return wrapper
+
+    for cls, init in zip(COUNTED, originals):
+        cls.__init__ = counting(init)  # type: ignore
+    try:
+        evaluate()
+    finally:
+        for cls, init in zip(COUNTED, originals):
+            cls.__init__ = init  # type: ignore
+
+    return count
+
+
+def peak_memory(evaluate) -> int:
+    tracemalloc.start()
+    evaluate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def best_time(evaluate, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        evaluate()
+        runs.append(time.perf_counter() - start)
+    return min(runs)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.allocations")
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'workload':>24} {'path':>8} {'objects':>10} {'peak KiB':>10} {'ms':>8}")
+    for workload in generate(args.scale):
+        tokens, error = Lexer("<bench>", workload.text).make_tokens()
+        ast = Parser(tokens).parse()
+        if error or ast.error:
+            continue
+
+        context = make_context(workload)
+        interpreter = Interpreter()
+        paths = {
+            "boxed": lambda: interpreter.visit_node(ast.node, context),
+            "unboxed": lambda: interpreter.visit(ast.node, context),
+        }
+
+        for name, evaluate in paths.items():
+            objects = count_allocations(evaluate)
+            peak = peak_memory(evaluate)
+            seconds = best_time(evaluate, args.repeat)
+            print(
+                f"{workload.name:>24} {name:>8} {objects:>10} "
+                f"{peak / 1024:>10.1f} {seconds * 1000:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Drives a running evaluation server and reports request latency.
+
+    python -m src.server &
+    python -m benchmarks.loadtest [--connections 8] [--requests 2000] [--depth 16]
+
+Each connection keeps up to --depth requests in flight.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from src.client import AsyncClient
+
+FORMULAS = [
+    "var x = 1",
+    "x * 2 + 3 / 4",
+    "(x + 1) ^ 2 - x",
+    "var x = x + 1",
+    "1 / (x - x)",
+]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def connection(args, latencies: list[float]):
+    client = await AsyncClient.connect(args.host, args.port, args.unix)
+    slots = asyncio.Semaphore(args.depth)
+
+    async def request(i: int):
+        async with slots:
+            start = time.perf_counter()
+            await client.evaluate(FORMULAS[i % len(FORMULAS)], args.engine)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(request(i) for i in range(args.requests)))
+    await client.close()
+
+
+async def load(args):
+    latencies: list[float] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(connection(args, latencies) for _ in range(args.connections))
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(latencies)} requests over {args.connections} connections "
+        f"in {elapsed:.2f}s, {len(latencies) / elapsed:,.0f} req/s"
+    )
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        print(f"{name}: {percentile(latencies, fraction) * 1000:.2f} ms")
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="per connection")
+    parser.add_argument("--depth", type=int, default=16)
+    parser.add_argument("--engine", default="vm")
+    args = parser.parse_args(argv)
+
+    asyncio.run(load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures the memory held by the tokens and the AST of a generated program,
+as plain objects with a __dict__ (how tokens and nodes were stored before
+they declared __slots__), as the slotted objects, and as a FlatAST. The
+ratios are relative to the plain objects.
+
+    python -m benchmarks.memory [terms]
+"""
+import sys
+import tracemalloc
+
+from src.flat import FlatAST
+from src.lexer import Lexer
+from src.nodes import node_children, postorder
+from src.parser import Parser
+
+# Plain classes standing in for each slotted one, made on first use
+UNSLOTTED: dict[type, type] = {}
+
+def generate(terms: int) -> str:
+    return " + ".join(f"(a{i % 10} * {i}.5 - {i}) / b" for i in range(terms))
+
+
+def copy_object(obj, slotted: bool):
+    """
+    A copy of a slotted object, either of the same class or of a plain class
+    with the same attributes in a __dict__.
+    """
+    cls = type(obj)
+    if slotted:
+        copy = cls.__new__(cls)
+    else:
+        if cls not in UNSLOTTED:
+            UNSLOTTED[cls] = type(cls.__name__, (), {})
+        copy = UNSLOTTED[cls]()
+
+    for name in cls.__slots__:
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def copy_tokens(tokens: list, slotted: bool) -> dict[int, object]:
+    return {id(token): copy_object(token, slotted) for token in tokens}
+
+
+def copy_tree(root, tokens: dict[int, object], slotted: bool):
+    """
+    Copies a tree children first. Nodes point at the copies in `tokens`
+    instead of the original tokens.
+    """
+    copies: dict[int, object] = {}
+    for node in postorder(root):
+        copy = copy_object(node, slotted)
+        for name in type(node).__slots__:
+            value = getattr(node, name)
+            if id(value) in tokens:
+                setattr(copy, name, tokens[id(value)])
+            elif any(value is child for child in node_children(node)):
+                setattr(copy, name, copies[id(value)])
+        copies[id(node)] = copy
+    return copies[id(root)]
+
+
+def measure_copies(tokens: list, node, slotted: bool) -> tuple[int, int]:
+    """The bytes held by copies of the tokens and of the tree's nodes."""
+    copies, tokens_size = measure(lambda: copy_tokens(tokens, slotted))
+    # The dict keyed by id only finds the copies, it isn't part of the result
+    tokens_size -= sys.getsizeof(copies)
+    _, ast_size = measure(lambda: copy_tree(node, copies, slotted))
+    return tokens_size, ast_size
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, size
+
+
+def main(terms: int = 20_000):
+    text = generate(terms)
+    print(f"source: {len(text):,} bytes, {terms:,} terms")
+
+    tokens = Lexer("<bench>", text).make_tokens()[0]
+    node = Parser(tokens).parse().node
+
+    # Both layouts are measured as copies sharing the same values (names,
+    # numbers, positions), so the difference is only in the objects themselves
+    plain_tokens_size, plain_ast_size = measure_copies(tokens, node, False)
+    tokens_size, ast_size = measure_copies(tokens, node, True)
+    flat, flat_size = measure(lambda: FlatAST.from_node(node))
+
+    print(f"{len(tokens):,} tokens, {len(flat):,} nodes")
+    print(f"{'':>12} {'tokens':>14} {'AST':>14} {'total':>14}")
+    for name, token_bytes, ast_bytes in (
+        ("__dict__", plain_tokens_size, plain_ast_size),
+        ("__slots__", tokens_size, ast_size),
+        ("FlatAST", 0, flat_size),
+    ):
+        total = token_bytes + ast_bytes
+        print(f"{name:>12} {token_bytes:>14,} {ast_bytes:>14,} {total:>14,}")
+
+    baseline = plain_tokens_size + plain_ast_size
+    print(f"__slots__ / __dict__: {(tokens_size + ast_size) / baseline:.2f}")
+    print(f"FlatAST / __dict__: {flat_size / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
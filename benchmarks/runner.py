@@ -0,0 +1,109 @@
+"""Times each stage of the pipeline on the generated workloads."""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.workloads import Workload
+from src.compiler import Compiler
+from src.interpreter import Context, Interpreter, SymbolTable
+from src.lexer import Lexer
+from src.optimizer import Optimizer
+from src.parser import Parser
+from src.vm import VM
+import src
+
+
+def make_context(workload: Workload) -> Context:
+    symbol_table = SymbolTable()
+    symbol_table.set("null", 0)
+
+    context = Context("<bench>")
+    context.symbol_table = symbol_table
+
+    for statement in workload.prelude:
+        program, error = src.compile_program(statement, "<prelude>")
+        if error:
+            raise ValueError(error.as_string())
+        program.execute(context, "vm")
+
+    return context
+
+
+def measure(stage: Callable[[], object], repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        runs.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(runs), "runs": runs, "peak_bytes": peak}
+
+
+def run_workload(workload: Workload, repeat: int) -> dict[str, dict]:
+    text = workload.text
+    context = make_context(workload)
+    results: dict[str, dict] = {}
+
+    def lex():
+        return Lexer("<bench>", text).make_tokens()
+
+    tokens, error = lex()
+    results["lex"] = measure(lex, repeat)
+    if error:
+        return results
+
+    def parse():
+        return Parser(tokens).parse()
+
+    ast = parse()
+    results["parse"] = measure(parse, repeat)
+    if ast.error:
+        results["report"] = measure(ast.error.as_string, repeat)
+        return results
+
+    def interpret():
+        return Interpreter().visit(ast.node, context)
+
+    try:
+        res = interpret()
+        results["interpret"] = measure(interpret, repeat)
+        if res.error:
+            results["report"] = measure(res.error.as_string, repeat)
+    except RecursionError:
+        results["interpret"] = {"error": "RecursionError"}
+
+    def optimize():
+        return Optimizer().visit(ast.node)
+
+    node = optimize()
+    results["optimize"] = measure(optimize, repeat)
+
+    def vm():
+        return VM().run(Compiler().compile(node), context)
+
+    vm()
+    results["vm"] = measure(vm, repeat)
+
+    return results
+
+
+def run_all(workloads: list[Workload], repeat: int, log: Callable = print) -> dict:
+    results = {}
+    for workload in workloads:
+        results[workload.name] = run_workload(workload, repeat)
+
+        stages = ", ".join(
+            f"{stage} {timing['seconds'] * 1000:.2f}ms"
+            for stage, timing in results[workload.name].items()
+            if "seconds" in timing
+        )
+        log(f"{workload.name}: {stages}")
+
+    return results
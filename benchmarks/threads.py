@@ -0,0 +1,76 @@
+"""
+Measures evaluation throughput as the number of threads grows, with one
+Session per thread sharing a single ProgramCache.
+
+    python -m benchmarks.threads [--runs N] [--engine vm] [--threads 1 2 4 8]
+
+Throughput only scales with thread count on free-threaded builds; with the
+GIL enabled it is expected to stay flat.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import ProgramCache
+from src.session import Session
+
+FORMULAS = [f"var x{i} = (x{i} + {i}) * 2 / 3 - {i} ^ 2" for i in range(16)]
+
+
+def worker(cache: ProgramCache, engine: str, runs: int) -> int:
+    session = Session(cache)
+    for i in range(len(FORMULAS)):
+        session.run(f"var x{i} = 1", "<bench>", engine)
+
+    for i in range(runs):
+        _, error = session.run(FORMULAS[i % len(FORMULAS)], "<bench>", engine)
+        if error:
+            raise ValueError(error.as_string())
+
+    return runs
+
+
+def measure(threads: int, engine: str, runs: int) -> float:
+    cache = ProgramCache()
+    start_barrier = threading.Barrier(threads + 1)
+
+    def task():
+        start_barrier.wait()
+        return worker(cache, engine, runs)
+
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [executor.submit(task) for _ in range(threads)]
+        start_barrier.wait()
+        start = time.perf_counter()
+        total = sum(future.result() for future in futures)
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.threads")
+    parser.add_argument("--runs", type=int, default=20_000, help="per thread")
+    parser.add_argument("--engine", default="vm")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    baseline = None
+    for threads in args.threads:
+        throughput = measure(threads, args.engine, args.runs)
+        baseline = baseline or throughput
+        print(
+            f"{threads:>3} threads: {throughput:12,.0f} runs/s "
+            f"({throughput / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Generators for scalable benchmark programs."""
+from __future__ import annotations
+
+
+class Workload:
+    def __init__(self, name: str, text: str, prelude: list[str] = None) -> None:
+        self.name = name
+        self.text = text
+        # Statements run once before timing, e.g. to define variables
+        self.prelude = prelude or []
+
+
+def deep_nesting(scale: int) -> Workload:
+    # Kept shallow enough for the recursive Interpreter
+    depth = min(scale, 400)
+    return Workload("deep_nesting", "(" * depth + "1" + " + 1)" * depth)
+
+
+def wide_sum(scale: int) -> Workload:
+    return Workload("wide_sum", " + ".join(str(i) for i in range(scale)))
+
+
+def variable_heavy(scale: int) -> Workload:
+    names = [f"v{i}" for i in range(min(scale, 100))]
+    prelude = [f"var {name} = {i}" for i, name in enumerate(names)]
+    text = " + ".join(
+        f"{names[i % len(names)]} * {names[(i * 7) % len(names)]}"
+        for i in range(scale)
+    )
+    return Workload("variable_heavy", text, prelude)
+
+
+def float_pow(scale: int) -> Workload:
+    text = " + ".join(f"{i % 13}.5 ^ 2 / {i % 7 + 1}.25 ^ 0.5" for i in range(scale))
+    return Workload("float_pow", text)
+
+
+def repeated_subexpressions(scale: int) -> Workload:
+    prelude = ["var a = 3", "var b = 4", "var c = 5"]
+    text = " + ".join(f"(a * b + c) * (a * b + c) / {i + 1}" for i in range(scale))
+    return Workload("repeated_subexpressions", text, prelude)
+
+
+def runtime_error(scale: int) -> Workload:
+    text = " + ".join(["1"] * scale) + " + 1 / (2 - 2)"
+    return Workload("runtime_error", text)
+
+
+def syntax_error(scale: int) -> Workload:
+    text = " + ".join(["1"] * scale) + " * )"
+    return Workload("syntax_error", text)
+
+
+WORKLOADS = {
+    "deep_nesting": deep_nesting,
+    "wide_sum": wide_sum,
+    "variable_heavy": variable_heavy,
+    "float_pow": float_pow,
+    "repeated_subexpressions": repeated_subexpressions,
+    "runtime_error": runtime_error,
+    "syntax_error": syntax_error,
+}
+
+
+def generate(scale: int, names: list[str] = None) -> list[Workload]:
+    return [WORKLOADS[name](scale) for name in names or WORKLOADS]
@@ -1,14 +1,56 @@
+import argparse
+import sys
+
 import src
+from src.script import mapped_lines, run_lines, stream_lines
+
+
+def repl(engine: str):
+    while True:
+        try:
+            command = input("basic> ")
+        except EOFError:
+            break
+
+        if command == "exit":
+            break
+
+        res, error = src.run(command, "<stdin>", engine)
+
+        if error:
+            print(error.as_string())
+        if res:
+            print(res)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="shell.py")
+    parser.add_argument("script", nargs="?", help="script to run, - for stdin")
+    parser.add_argument("--engine", choices=src.ENGINES, default="interpreter")
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="run every statement and report all errors instead of stopping",
+    )
+    args = parser.parse_args(argv)
+
+    if args.script is None and sys.stdin.isatty():
+        repl(args.engine)
+        return 0
+
+    if args.script in (None, "-"):
+        lines, fn = stream_lines(sys.stdin.buffer), "<stdin>"
+    else:
+        lines, fn = mapped_lines(args.script), args.script
 
-while True:
-    command = input("basic> ")
+    report = run_lines(
+        lines, fn, sys.stdout, src.default_session, args.engine, args.keep_going
+    )
 
-    if command == "exit":
-        break
+    if args.keep_going and report.errors:
+        print(f"{len(report.errors)} error(s)", file=sys.stderr)
+    return 1 if report.errors else 0
 
-    res, error = src.run(command, "<stdin>")
 
-    if error:
-        print(error.as_string())
-    if res:
-        print(res)
+if __name__ == "__main__":
+    sys.exit(main())
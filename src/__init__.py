@@ -1,29 +1,44 @@
 from src.interpreter import Context, Interpreter, SymbolTable
 from src.parser import Parser
 from src.lexer import Lexer
-
-global_symbol_table = SymbolTable()
-global_symbol_table.set("null", 0)
-
-
-def run(text: str, fn: str):
-    lexer = Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
-
-    if error:
-        return [], error
-
-    parser = Parser(tokens)
-    ast = parser.parse()
-
-    if ast.error:
-        return [], ast.error
-
-    interpreter = Interpreter()
-
-    context = Context("<module>")
-    context.symbol_table = global_symbol_table
-
-    res = interpreter.visit(ast.node, context)
-
-    return res.value, res.error
+from src.compiler import Compiler
+from src.vm import VM
+from src.closure import ClosureCompiler
+from src.optimizer import Optimizer
+from src.program import ENGINES, Program, compile_program
+from src.cache import ProgramCache
+from src.diskcache import load_program
+from src.batch import BatchResult, evaluate_batch
+from src.profiler import Instrument, Profiler
+from src.session import Session
+from src.reactive import Reactive
+from src.snapshot import load_snapshot, save_snapshot
+
+program_cache = ProgramCache()
+default_session = Session(program_cache)
+
+# Kept for callers that read or seed the shared variables directly
+global_symbol_table = default_session.symbol_table
+
+
+def run(
+    text: str,
+    fn: str,
+    engine: str = "interpreter",
+    optimize: bool = True,
+    instrument: Instrument | None = None,
+):
+    return default_session.run(text, fn, engine, optimize, instrument)
+
+
+def run_batch(text: str, fn: str, columns: dict, optimize: bool = True):
+    return default_session.run_batch(text, fn, columns, optimize)
+
+
+def run_file(
+    path: str,
+    engine: str = "interpreter",
+    optimize: bool = True,
+    cache_dir: str | None = None,
+):
+    return default_session.run_file(path, engine, optimize, cache_dir)
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import operator
+from typing import Mapping, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+from src.closure import ClosureCompiler
+from src.error import LimitExceededError, RTError
+from src.interpreter import Context, RunTimeResult, SymbolTable, value_span
+from src.limits import start_budget
+from src.nodes import (
+    BinOpNode,
+    NumberNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    postorder,
+)
+from src.token import TokenType
+from src.values import Number
+
+# int64 results are only trusted below this many bits, larger ones are
+# computed again on Python ints
+INT64_SAFE_BITS = 62
+
+PYTHON_OPS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.POW: operator.pow,
+}
+NUMPY_OPS = {}
+if np is not None:
+    NUMPY_OPS = {
+        TokenType.PLUS: np.add,
+        TokenType.MINUS: np.subtract,
+        TokenType.MUL: np.multiply,
+        TokenType.POW: np.power,
+    }
+
+
+class BatchResult:
+    def __init__(self, values, errors: dict[int, RTError]) -> None:
+        # One value per row, rows listed in `errors` hold no meaningful value
+        self.values = values
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f"BatchResult({len(self.values)} rows, {len(self.errors)} errors)"
+
+
+class BatchAbort(Exception):
+    def __init__(self, error: RTError) -> None:
+        super().__init__(error.details)
+        self.error = error
+
+
+class BatchEvaluator:
+    """
+    Evaluates an expression over whole columns of bindings at once. Failing
+    rows are masked out and reported per row instead of stopping the batch.
+    """
+
+    def __init__(self, columns: Mapping[str, object], context: Context) -> None:
+        self.columns = {name: np.asarray(column) for name, column in columns.items()}
+        self.context = context
+        self.length = batch_length(columns)
+
+        self.failed = np.zeros(self.length, dtype=bool)
+        self.errors: dict[int, RTError] = {}
+
+    def evaluate(self, node) -> BatchResult:
+        with np.errstate(all="ignore"):
+            values = self.visit(node)
+
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(self.length, values)
+        if self.failed.any():
+            values = np.where(self.failed, np.nan, values)
+
+        return BatchResult(values, dict(sorted(self.errors.items())))
+
+    def visit(self, node):
+        method_name = f"visit_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_visit_method)
+        return method(node)
+
+    def no_visit_method(self, node):
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    def visit_NumberNode(self, node: NumberNode):
+        return node.tok.value
+
+    def visit_VarAccessNode(self, node: VarAccessNode):
+        var_name = str(node.var_name_tok.value)
+
+        if var_name in self.columns:
+            return self.columns[var_name]
+
+        value = self.context.symbol_table.get(var_name)
+        if not value:
+            raise BatchAbort(
+                RTError(
+                    f"{var_name} is not defined",
+                    node.pos_start,
+                    node.pos_end,
+                    self.context,
+                )
+            )
+        return value.value
+
+    def visit_VarAssignNode(self, node: VarAssignNode):
+        # Assignments are local to the batch and never reach the symbol table
+        value = self.visit(node.value_node)
+        self.columns[str(node.var_name_tok.value)] = value
+        return value
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode):
+        value = self.visit(node.node)
+
+        if node.op_tok.type == TokenType.MINUS:
+            return -value
+        return value
+
+    def visit_BinOpNode(self, node: BinOpNode):
+        left = self.visit(node.left_node)
+        right = self.visit(node.right_node)
+        op = node.op_tok.type
+
+        if op == TokenType.DIV:
+            return self.divide(left, right, node.right_node)
+        if op not in NUMPY_OPS:
+            raise Exception(f"Unknown binary operator {op}")
+        # Python ints too large for int64 arrive as object arrays
+        exact = is_integer(left) and is_integer(right)
+        if exact or is_object(left) or is_object(right):
+            return self.exact_op(op, left, right, node.right_node)
+        return NUMPY_OPS[op](left, right)
+
+    def exact_op(self, op: str, left, right, right_node):
+        """
+        Integer arithmetic as exact as the other engines. NumPy's int64 is
+        used while a float estimate shows no row can overflow or exceed the
+        int size limit, otherwise rows still running are computed one by one
+        on Python numbers and those over the limit fail.
+        """
+        left = np.asarray(left)
+        right = np.asarray(right)
+        limits = self.context.limits
+
+        safe_bits = INT64_SAFE_BITS
+        if op in (TokenType.MUL, TokenType.POW) and limits is not None:
+            if limits.max_int_bits is not None:
+                safe_bits = min(safe_bits, limits.max_int_bits)
+
+        # NumPy refuses negative integer powers of integers, Python gives
+        # floats for just those rows
+        negative_powers = op == TokenType.POW and np.any(right < 0)
+        if left.dtype != object and right.dtype != object and not negative_powers:
+            estimate = NUMPY_OPS[op](left.astype(float), right.astype(float))
+            # Halved since the estimate rounds the operands
+            if not np.any(np.abs(estimate) >= 2.0 ** (safe_bits - 1)):
+                return NUMPY_OPS[op](left, right)
+
+        budget = start_budget(limits)
+        span = value_span(right_node)
+        lefts = np.broadcast_to(left, (self.length,)).astype(object)
+        rights = np.broadcast_to(right, (self.length,)).astype(object)
+        values = np.zeros(self.length, dtype=object)
+
+        for row in range(self.length):
+            if self.failed[row]:
+                continue
+
+            lhs, rhs = lefts[row], rights[row]
+            details = None
+            if budget is not None and op == TokenType.MUL:
+                details = budget.check_mul(lhs, rhs)
+            elif budget is not None and op == TokenType.POW:
+                details = budget.check_pow(lhs, rhs)
+
+            if details:
+                self.fail(row, LimitExceededError(details, *span, self.context))
+                continue
+
+            try:
+                values[row] = PYTHON_OPS[op](lhs, rhs)
+            except ArithmeticError as e:
+                # Like `0^-1`, which the other engines can't compute either
+                self.fail(row, RTError(str(e), *span, self.context))
+
+        return values
+
+    def fail(self, row: int, error: RTError):
+        self.errors[row] = error
+        self.failed[row] = True
+
+    def divide(self, left, right, divisor_node):
+        zero = np.broadcast_to(np.asarray(right) == 0, (self.length,))
+
+        new_failures = zero & ~self.failed
+        if new_failures.any():
+            # Every failing row shares the error raised at this division
+            error = RTError(
+                "Division by zero", *value_span(divisor_node), self.context
+            )
+            for row in np.flatnonzero(new_failures):
+                self.errors[int(row)] = error
+            self.failed |= zero
+
+        if zero.any():
+            # Python ints in object arrays raise on zero instead of giving inf
+            right = np.where(zero, 1, right)
+        return np.true_divide(left, right)
+
+
+def is_integer(value) -> bool:
+    return np.asarray(value).dtype.kind in "iuO"
+
+
+def is_object(value) -> bool:
+    return np.asarray(value).dtype == object
+
+
+def batch_length(columns: Mapping[str, object]) -> int:
+    lengths = {len(column) for column in columns.values()}  # type: ignore
+    if len(lengths) > 1:
+        raise ValueError("All columns in a batch must have the same length")
+    return lengths.pop() if lengths else 1
+
+
+def evaluate_batch(
+    node, columns: Mapping[str, Sequence[int | float]], context: Context
+):
+    """
+    Evaluates `node` once per row of `columns`, a mapping of variable names to
+    NumPy arrays, `array.array`s or lists of equal length. Returns a
+    BatchResult and an error that stopped the whole batch, if any.
+    """
+    if np is not None:
+        try:
+            return BatchEvaluator(columns, context).evaluate(node), None
+        except BatchAbort as abort:
+            return None, abort.error
+
+    return evaluate_rows(node, columns, context)
+
+
+def unbound_name(node, columns: Mapping, context: Context) -> RTError | None:
+    """The error for the first variable read that no row could find."""
+    assigned: set[str] = set()
+
+    # Post-order visits reads and assignments in evaluation order
+    for child in postorder(node):
+        if isinstance(child, VarAssignNode):
+            assigned.add(str(child.var_name_tok.value))
+        elif isinstance(child, VarAccessNode):
+            name = str(child.var_name_tok.value)
+            if (
+                name not in columns
+                and name not in assigned
+                and not context.symbol_table.get(name)
+            ):
+                return RTError(
+                    f"{name} is not defined", child.pos_start, child.pos_end, context
+                )
+
+    return None
+
+
+def evaluate_rows(
+    node, columns: Mapping[str, Sequence[int | float]], context: Context
+):
+    """Row by row fallback used when NumPy is not installed."""
+    # A name missing from every row stops the batch, like in NumPy mode
+    error = unbound_name(node, columns, context)
+    if error:
+        return None, error
+
+    run = ClosureCompiler().compile(node)
+    length = batch_length(columns)
+
+    values: list = []
+    errors: dict[int, RTError] = {}
+
+    symbol_table = SymbolTable(context.symbol_table)
+    row_context = Context(
+        context.display_name, context.parent, context.parent_entry_pos
+    )
+    row_context.symbol_table = symbol_table
+    row_context.limits = context.limits
+
+    for row in range(length):
+        symbol_table.symbols = {
+            name: Number(column[row]) for name, column in columns.items()
+        }
+        try:
+            res = run(row_context)
+        except ArithmeticError as e:
+            # Unlike NumPy mode, the row can't tell which operation failed
+            res = RunTimeResult().failure(
+                RTError(str(e), node.pos_start, node.pos_end, row_context)
+            )
+
+        if res.error:
+            errors[row] = res.error
+            values.append(float("nan"))
+        else:
+            values.append(res.value.value)  # type: ignore
+
+    return BatchResult(values, errors), None
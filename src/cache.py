@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from src.program import Program
+
+
+class ProgramCache:
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.programs: OrderedDict[tuple, Program] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Shared between sessions that may run on different threads
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple) -> Program | None:
+        with self.lock:
+            program = self.programs.get(key)
+
+            if program is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.programs.move_to_end(key)
+            return program
+
+    def put(self, key: tuple, program: Program):
+        if self.maxsize <= 0:
+            return
+
+        with self.lock:
+            self.programs[key] = program
+            self.programs.move_to_end(key)
+            self.evict()
+
+    def resize(self, maxsize: int):
+        with self.lock:
+            self.maxsize = maxsize
+            self.evict()
+
+    def evict(self):
+        # Callers hold the lock
+        while len(self.programs) > max(self.maxsize, 0):
+            self.programs.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.programs.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "size": len(self.programs),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
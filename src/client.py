@@ -0,0 +1,115 @@
+"""Clients for the evaluation server in src/server.py."""
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+from collections import deque
+
+
+def encode(request_id: int, text: str, engine: str) -> bytes:
+    request = {"id": request_id, "text": text, "engine": engine}
+    return json.dumps(request).encode() + b"\n"
+
+
+def decode(line: bytes):
+    response = json.loads(line)
+    return response["value"], response["error"]
+
+
+class Client:
+    """A blocking client; every call waits for the answers it asked for."""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 8765, path: str | None = None
+    ) -> None:
+        if path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(path)
+        else:
+            self.sock = socket.create_connection((host, port))
+
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def evaluate(self, text: str, engine: str = "interpreter"):
+        return self.evaluate_many([text], engine)[0]
+
+    def evaluate_many(self, texts: list[str], engine: str = "interpreter"):
+        """Sends every request before reading any answer."""
+        for text in texts:
+            self.file.write(encode(self.next_id, text, engine))
+            self.next_id += 1
+        self.file.flush()
+
+        results = []
+        for _ in texts:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            results.append(decode(line))
+        return results
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncClient:
+    """
+    An asyncio client that can have many requests in flight on one
+    connection. Answers arrive in request order, which is how they are
+    matched up with the waiting callers.
+    """
+
+    def __init__(self) -> None:
+        self.reader: asyncio.StreamReader = None  # type: ignore
+        self.writer: asyncio.StreamWriter = None  # type: ignore
+        self.pending: deque[asyncio.Future] = deque()
+        self.next_id = 0
+        self.receiver: asyncio.Task = None  # type: ignore
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 8765, path: str | None = None
+    ) -> AsyncClient:
+        client = cls()
+        if path:
+            client.reader, client.writer = await asyncio.open_unix_connection(path)
+        else:
+            client.reader, client.writer = await asyncio.open_connection(host, port)
+
+        client.receiver = asyncio.create_task(client.receive())
+        return client
+
+    async def receive(self):
+        while line := await self.reader.readline():
+            future = self.pending.popleft()
+            if not future.cancelled():
+                future.set_result(decode(line))
+
+        while self.pending:
+            self.pending.popleft().set_exception(
+                ConnectionError("Server closed the connection")
+            )
+
+    async def evaluate(self, text: str, engine: str = "interpreter"):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+
+        self.writer.write(encode(self.next_id, text, engine))
+        self.next_id += 1
+        await self.writer.drain()
+
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from src.error import LimitExceededError, RTError
+from src.interpreter import Context, RunTimeAbort, RunTimeResult, value_span
+from src.limits import start_budget
+from src.nodes import BinOpNode, NumberNode, UnaryOpNode, VarAccessNode, VarAssignNode
+from src.resolver import UNDEFINED, Resolver, load_frame
+from src.token import TokenType
+from src.values import Number
+
+
+class ClosureCompiler:
+    def __init__(self, counts_steps: bool = False) -> None:
+        self.slots: dict[str, int] = {}
+        # Step and time limits need a check around every node, which is only
+        # compiled in when asked for
+        self.counts_steps = counts_steps
+        self.budget_slot = 0
+
+    def compile(self, node) -> Callable[[Context], RunTimeResult]:
+        self.slots = Resolver().resolve(node)
+        names = list(self.slots)
+        # The run's Budget travels in the frame, after the variables
+        self.budget_slot = len(names)
+
+        body = self.visit(node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def run(context: Context):
+            res = RunTimeResult()
+            frame = load_frame(names, context.symbol_table)
+            frame.append(start_budget(context.limits))
+            try:
+                value = body(frame, context)
+            except RunTimeAbort as abort:
+                return res.failure(abort.error)
+
+            return res.success(
+                Number(value).set_context(context).set_pos(pos_start, pos_end)
+            )
+
+        return run
+
+    def visit(self, node):
+        method_name = f"visit_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_visit_method)
+        if self.counts_steps:
+            return self.counted(node, method(node))
+        return method(node)
+
+    def counted(self, node, body):
+        budget_slot = self.budget_slot
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def step(frame: list, context: Context):
+            budget = frame[budget_slot]
+            if budget is not None:
+                budget.steps += 1
+                if budget.steps >= budget.next_check:
+                    details = budget.check()
+                    if details:
+                        raise RunTimeAbort(
+                            LimitExceededError(details, pos_start, pos_end, context)
+                        )
+            return body(frame, context)
+
+        return step
+
+    def no_visit_method(self, node):
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    def visit_NumberNode(self, node: NumberNode):
+        value = node.tok.value
+        return lambda frame, context: value
+
+    def visit_BinOpNode(self, node: BinOpNode):
+        left = self.visit(node.left_node)
+        right = self.visit(node.right_node)
+        op = node.op_tok.type
+
+        if op == TokenType.PLUS:
+            return lambda frame, context: left(frame, context) + right(frame, context)
+        if op == TokenType.MINUS:
+            return lambda frame, context: left(frame, context) - right(frame, context)
+        if op == TokenType.MUL or op == TokenType.POW:
+            # Results too large for the Budget are reported at the right
+            # operand's value
+            budget_slot = self.budget_slot
+            pos_start, pos_end = value_span(node.right_node)
+            is_pow = op == TokenType.POW
+
+            def mul_or_pow(frame: list, context: Context):
+                lhs = left(frame, context)
+                rhs = right(frame, context)
+
+                budget = frame[budget_slot]
+                if budget is not None:
+                    if is_pow:
+                        details = budget.check_pow(lhs, rhs)
+                    else:
+                        details = budget.check_mul(lhs, rhs)
+                    if details:
+                        raise RunTimeAbort(
+                            LimitExceededError(details, pos_start, pos_end, context)
+                        )
+
+                return lhs**rhs if is_pow else lhs * rhs
+
+            return mul_or_pow
+        if op == TokenType.DIV:
+            # Division by zero is reported at the span of the divisor's value
+            pos_start, pos_end = value_span(node.right_node)
+
+            def div(frame: list, context: Context):
+                dividend = left(frame, context)
+                divisor = right(frame, context)
+                if divisor == 0:
+                    raise RunTimeAbort(
+                        RTError("Division by zero", pos_start, pos_end, context)
+                    )
+                return dividend / divisor
+
+            return div
+
+        raise Exception(f"Unknown binary operator {op}")
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode):
+        operand = self.visit(node.node)
+
+        if node.op_tok.type == TokenType.MINUS:
+            return lambda frame, context: -operand(frame, context)
+        return operand
+
+    def visit_VarAccessNode(self, node: VarAccessNode):
+        var_name = str(node.var_name_tok.value)
+        slot = self.slots[var_name]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def access(frame: list, context: Context):
+            value = frame[slot]
+            if value is UNDEFINED:
+                raise RunTimeAbort(
+                    RTError(f"{var_name} is not defined", pos_start, pos_end, context)
+                )
+            return value
+
+        return access
+
+    def visit_VarAssignNode(self, node: VarAssignNode):
+        var_name = str(node.var_name_tok.value)
+        slot = self.slots[var_name]
+        value_node = self.visit(node.value_node)
+        pos_start, pos_end = node.value_node.pos_start, node.value_node.pos_end
+
+        def assign(frame: list, context: Context):
+            value = frame[slot] = value_node(frame, context)
+            context.symbol_table.set(
+                var_name,
+                Number(value).set_context(context).set_pos(pos_start, pos_end),
+            )
+            return value
+
+        return assign
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from src.nodes import (
+    BinOpNode,
+    NumberNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    postorder,
+)
+from src.intern import Interner
+from src.interpreter import value_span
+from src.position import Position
+from src.resolver import Resolver
+from src.token import TokenType
+
+
+class OpCode:
+    LOAD_CONST = 0
+    LOAD_SLOT = 1
+    STORE_SLOT = 2
+    BINARY_ADD = 3
+    BINARY_SUB = 4
+    BINARY_MUL = 5
+    BINARY_DIV = 6
+    BINARY_POW = 7
+    UNARY_NEG = 8
+    LOAD_TEMP = 9
+    STORE_TEMP = 10
+
+
+BINARY_OPS = {
+    TokenType.PLUS: OpCode.BINARY_ADD,
+    TokenType.MINUS: OpCode.BINARY_SUB,
+    TokenType.MUL: OpCode.BINARY_MUL,
+    TokenType.DIV: OpCode.BINARY_DIV,
+    TokenType.POW: OpCode.BINARY_POW,
+}
+
+
+class Chunk:
+    def __init__(self) -> None:
+        # Instructions are stored flat as (opcode, argument) pairs
+        self.code: list[int] = []
+        self.constants: list[int | float] = []
+        # Variable names indexed by frame slot
+        self.names: list[str] = []
+        # Slots after the named ones holding common subexpressions
+        self.temps = 0
+
+        # Side table holding the source span reported by each instruction
+        self.positions: list[tuple[Position, Position] | None] = []
+        # Nodes evaluated once each instruction has run, so step limits
+        # count the same nodes as the other engines
+        self.steps: list[int] = []
+        self.uncounted = 0
+
+        self.pos_start: Position = None  # type: ignore
+        self.pos_end: Position = None  # type: ignore
+
+    def emit(
+        self,
+        op: int,
+        arg: int = 0,
+        span: tuple[Position, Position] = None,
+        steps: int = 1,
+    ):
+        self.code.append(op)
+        self.code.append(arg)
+        self.positions.append(span)
+
+        steps += self.uncounted
+        self.uncounted = 0
+        self.steps.append(self.steps[-1] + steps if self.steps else steps)
+
+    def add_constant(self, value: int | float):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def __repr__(self) -> str:
+        lines = []
+        for ip in range(0, len(self.code), 2):
+            op, arg = self.code[ip], self.code[ip + 1]
+            lines.append(f"{ip // 2:4} {OPCODE_NAMES[op]:<12} {arg}")
+        return "\n".join(lines)
+
+
+OPCODE_NAMES = {
+    value: name for name, value in vars(OpCode).items() if not name.startswith("_")
+}
+
+
+class Compiler:
+    def __init__(self, cse: bool = True) -> None:
+        self.slots: dict[str, int] = {}
+        # Compute repeated subexpressions once per run
+        self.cse = cse
+
+    def compile(self, node) -> Chunk:
+        chunk = Chunk()
+        self.slots = Resolver().resolve(node)
+        chunk.names = list(self.slots)
+
+        if self.cse:
+            self.compile_shared(node, chunk)
+        else:
+            # Emitting in post-order leaves each node's operands on the stack
+            # before its own instruction runs
+            for child in postorder(node):
+                self.visit(child, chunk)
+
+        # Nodes that emit nothing, like a unary plus, count with the next
+        # instruction, or the last one when they come at the end
+        chunk.steps[-1] += chunk.uncounted
+        chunk.uncounted = 0
+
+        chunk.pos_start = node.pos_start
+        chunk.pos_end = node.pos_end
+        return chunk
+
+    def compile_shared(self, node, chunk: Chunk):
+        """
+        Emits like the post-order walk, except that an operation seen before
+        with the same versioned id is stored in a temp slot the first time
+        and loaded from it afterwards, instead of being evaluated again.
+        """
+        numbering = Interner().number(node, versioned=True)
+        nodes, ids = numbering.nodes, numbering.ids
+        root = len(nodes) - 1
+
+        def shareable(i: int) -> bool:
+            node = nodes[i]
+            return isinstance(node, BinOpNode) or (
+                isinstance(node, UnaryOpNode) and node.op_tok.type == TokenType.MINUS
+            )
+
+        # Occurrences are counted in evaluation order, not counting those
+        # inside an occurrence that will itself be loaded from a temp slot
+        seen: set[int] = set()
+        repeated: set[int] = set()
+        stack = [root]
+        while stack:
+            i = stack.pop()
+            if shareable(i):
+                if ids[i] in seen:
+                    repeated.add(ids[i])
+                    continue
+                seen.add(ids[i])
+            stack.extend(reversed(numbering.children(i)))
+
+        temps: dict[int, int] = {}
+        walk = [(root, False)]
+        while walk:
+            i, expanded = walk.pop()
+            node_id = ids[i]
+
+            if expanded:
+                self.visit(nodes[i], chunk)
+                if node_id in repeated and shareable(i):
+                    temps[node_id] = len(chunk.names) + chunk.temps
+                    chunk.temps += 1
+                    chunk.emit(OpCode.STORE_TEMP, temps[node_id], steps=0)
+            elif node_id in temps:
+                # Counts every node of the subtree it stands in for
+                size = numbering.sizes[i]
+                chunk.emit(OpCode.LOAD_TEMP, temps[node_id], steps=size)
+            else:
+                walk.append((i, True))
+                children = numbering.children(i)
+                walk.extend((child, False) for child in reversed(children))
+
+    def visit(self, node, chunk: Chunk):
+        method_name = f"visit_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_visit_method)
+        return method(node, chunk)
+
+    def no_visit_method(self, node, chunk: Chunk):
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    def visit_NumberNode(self, node: NumberNode, chunk: Chunk):
+        chunk.emit(OpCode.LOAD_CONST, chunk.add_constant(node.tok.value))  # type: ignore
+
+    def visit_BinOpNode(self, node: BinOpNode, chunk: Chunk):
+        # Division by zero and limits are reported at the span of the right
+        # operand's value, as in the Interpreter
+        chunk.emit(BINARY_OPS[node.op_tok.type], span=value_span(node.right_node))
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode, chunk: Chunk):
+        if node.op_tok.type == TokenType.MINUS:
+            chunk.emit(OpCode.UNARY_NEG)
+        else:
+            chunk.uncounted += 1
+
+    def visit_VarAccessNode(self, node: VarAccessNode, chunk: Chunk):
+        chunk.emit(
+            OpCode.LOAD_SLOT,
+            self.slots[str(node.var_name_tok.value)],
+            (node.pos_start, node.pos_end),
+        )
+
+    def visit_VarAssignNode(self, node: VarAssignNode, chunk: Chunk):
+        chunk.emit(
+            OpCode.STORE_SLOT,
+            self.slots[str(node.var_name_tok.value)],
+            (node.value_node.pos_start, node.value_node.pos_end),
+        )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import tempfile
+
+from src.flat import FlatAST
+from src.program import Program, compile_program
+from src.source import SourceFile
+
+MAGIC = b"BSC\x00"
+FORMAT_VERSION = 2
+
+CACHE_DIR_NAME = "__basiccache__"
+CACHE_SUFFIX = ".bsc"
+
+
+def dump_node(node) -> bytes:
+    return FlatAST.from_node(node).to_bytes()
+
+
+def load_node(data: bytes, fn: str, text: str):
+    return FlatAST.from_bytes(data).to_node(SourceFile(fn, text))
+
+
+def cache_path(path: str, cache_dir: str | None = None) -> str:
+    if cache_dir is None:
+        directory, name = os.path.split(os.path.abspath(path))
+        return os.path.join(directory, CACHE_DIR_NAME, name + CACHE_SUFFIX)
+
+    # Files from different directories share one cache directory
+    path_hash = hashlib.blake2b(
+        os.path.abspath(path).encode(), digest_size=8
+    ).hexdigest()
+    return os.path.join(
+        cache_dir, f"{os.path.basename(path)}.{path_hash}{CACHE_SUFFIX}"
+    )
+
+
+def source_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def read_cache(path: str, stat: os.stat_result, digest: bytes, optimize: bool):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    if not data.startswith(MAGIC):
+        return None
+
+    try:
+        version, mtime, size, cached_digest, cached_optimize, payload = marshal.loads(
+            data[len(MAGIC) :]
+        )
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    if (
+        version != FORMAT_VERSION
+        or mtime != stat.st_mtime_ns
+        or size != stat.st_size
+        or cached_digest != digest
+        or cached_optimize != optimize
+    ):
+        return None
+
+    return payload
+
+
+def write_cache(
+    path: str, stat: os.stat_result, digest: bytes, optimize: bool, payload: bytes
+):
+    header = (FORMAT_VERSION, stat.st_mtime_ns, stat.st_size, digest, optimize)
+    data = MAGIC + marshal.dumps(header + (payload,))
+
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a private file and rename it into place, so concurrent
+        # readers and writers only ever see complete cache files
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # An unwritable cache directory only costs the cache, not the run
+        pass
+
+
+def load_program(path: str, optimize: bool = True, cache_dir: str | None = None):
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        raw = file.read()
+
+    # A script is a single expression, the trailing newline is not part of it
+    text = raw.decode().rstrip("\r\n")
+    digest = source_hash(text)
+    cached = cache_path(path, cache_dir)
+
+    payload = read_cache(cached, stat, digest, optimize)
+    if payload is not None:
+        try:
+            return Program(load_node(payload, path, text)), None
+        except (EOFError, ValueError, TypeError, IndexError):
+            pass
+
+    program, error = compile_program(text, path, optimize)
+    if error:
+        return None, error
+
+    write_cache(cached, stat, digest, optimize, dump_node(program.node))
+    return program, None
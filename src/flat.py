@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import marshal
+from array import array
+from dataclasses import fields
+
+from src.nodes import (
+    BinOpNode,
+    NumberNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    node_children,
+    node_token,
+    postorder,
+)
+from src.position import Position
+from src.source import SourceFile
+from src.token import Token, TokenType
+
+NUMBER, VAR_ACCESS, VAR_ASSIGN, UNARY_OP, BIN_OP = range(5)
+
+NODE_KINDS = {
+    NumberNode: NUMBER,
+    VarAccessNode: VAR_ACCESS,
+    VarAssignNode: VAR_ASSIGN,
+    UnaryOpNode: UNARY_OP,
+    BinOpNode: BIN_OP,
+}
+
+TOKEN_TYPES = [field.default for field in fields(TokenType)]
+TOKEN_TYPE_INDEX = {tok_type: i for i, tok_type in enumerate(TOKEN_TYPES)}
+
+NO_CHILD = -1
+
+
+class FlatAST:
+    """
+    An AST stored as parallel arrays indexed by node, in post-order so every
+    child comes before its parent and the root is the last node.
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.tok_types = array("B")
+        self.values: list[str | int | float | None] = []
+
+        self.left = array("i")
+        self.right = array("i")
+
+        self.tok_starts = array("i")
+        self.tok_ends = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @classmethod
+    def from_node(cls, root) -> FlatAST:
+        flat = cls()
+        indices: list[int] = []
+
+        for node in postorder(root):
+            children = node_children(node)
+
+            # Children were finished last, so their indices sit on top
+            right = indices.pop() if len(children) == 2 else NO_CHILD
+            left = indices.pop() if children else NO_CHILD
+
+            tok = node_token(node)
+            flat.kinds.append(NODE_KINDS[type(node)])
+            flat.tok_types.append(TOKEN_TYPE_INDEX[tok.type])
+            flat.values.append(tok.value)
+            flat.left.append(left)
+            flat.right.append(right)
+            flat.tok_starts.append(tok.idx_start)
+            flat.tok_ends.append(tok.idx_end)
+            flat.starts.append(node.pos_start.idx)
+            flat.ends.append(node.pos_end.idx)
+
+            indices.append(len(flat) - 1)
+
+        return flat
+
+    def to_node(self, source: SourceFile):
+        nodes: list = []
+        push = nodes.append
+        make_token = Token.from_span
+
+        for i, kind in enumerate(self.kinds):
+            tok = make_token(
+                TOKEN_TYPES[self.tok_types[i]],
+                self.values[i],
+                self.tok_starts[i],
+                self.tok_ends[i],
+                source,
+            )
+
+            if kind == NUMBER:
+                node = NumberNode(tok)
+            elif kind == BIN_OP:
+                node = BinOpNode(nodes[self.left[i]], tok, nodes[self.right[i]])
+            elif kind == UNARY_OP:
+                node = UnaryOpNode(tok, nodes[self.left[i]])
+            elif kind == VAR_ACCESS:
+                node = VarAccessNode(tok)
+            else:
+                node = VarAssignNode(tok, nodes[self.left[i]])
+
+            # The optimizer may give a node the span of an expression it replaced
+            start, end = self.starts[i], self.ends[i]
+            if node.pos_start.idx != start or node.pos_end.idx != end:
+                node.pos_start = Position(start, source)
+                node.pos_end = Position(end, source)
+
+            push(node)
+
+        return nodes[-1]
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps(
+            (
+                self.kinds.tobytes(),
+                self.tok_types.tobytes(),
+                self.values,
+                self.left.tobytes(),
+                self.right.tobytes(),
+                self.tok_starts.tobytes(),
+                self.tok_ends.tobytes(),
+                self.starts.tobytes(),
+                self.ends.tobytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> FlatAST:
+        flat = cls()
+        (
+            kinds,
+            tok_types,
+            flat.values,
+            left,
+            right,
+            tok_starts,
+            tok_ends,
+            starts,
+            ends,
+        ) = marshal.loads(data)
+
+        flat.kinds.frombytes(kinds)
+        flat.tok_types.frombytes(tok_types)
+        flat.left.frombytes(left)
+        flat.right.frombytes(right)
+        flat.tok_starts.frombytes(tok_starts)
+        flat.tok_ends.frombytes(tok_ends)
+        flat.starts.frombytes(starts)
+        flat.ends.frombytes(ends)
+
+        if not (len(flat.kinds) == len(flat.values) == len(flat.ends)):
+            raise ValueError("Corrupt flat AST")
+        return flat
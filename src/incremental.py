@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from itertools import accumulate
+
+from src.error import Error
+from src.program import Program, compile_source
+from src.session import Session
+from src.source import SourceFile
+
+# Lines per block of a Document
+BLOCK_SIZE = 256
+
+
+class Line:
+    """One statement of a Document, compiled when the line is created."""
+
+    __slots__ = ("source", "program", "error")
+
+    def __init__(self, source: SourceFile, optimize: bool) -> None:
+        self.source = source
+        self.program: Program | None = None
+        self.error: Error | None = None
+
+        if source.text.strip():
+            self.program, self.error = compile_source(source, optimize)
+
+    @property
+    def text(self) -> str:
+        return self.source.text
+
+
+class Document:
+    """
+    A buffer of statements, one per line, kept compiled across edits.
+
+    Statements can't span lines, so an edit only re-lexes and re-parses the
+    lines it touches. Lines are kept in blocks with the size of each block,
+    so finding and replacing them costs the size of the edit plus one pass
+    over the block sizes, and the lines after it are left alone. Their line
+    numbers are brought up to date when the document is run or its errors
+    are read, which visit every line anyway.
+    """
+
+    def __init__(self, text: str = "", fn: str = "<document>", optimize: bool = True):
+        self.fn = fn
+        self.optimize = optimize
+
+        lines = [self.make_line(line, ln) for ln, line in enumerate(text.split("\n"))]
+        self.blocks: list[list[Line]] = [
+            lines[i : i + BLOCK_SIZE] for i in range(0, len(lines), BLOCK_SIZE)
+        ]
+        # Characters in each block, counting a newline after every line
+        self.sizes = [block_size(block) for block in self.blocks]
+
+    def make_line(self, text: str, ln: int) -> Line:
+        return Line(SourceFile(self.fn, text, ln), self.optimize)
+
+    @property
+    def lines(self) -> list[Line]:
+        return [line for block in self.blocks for line in block]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(line.text for line in self.lines)
+
+    def __len__(self) -> int:
+        # Without the newline counted after the last line
+        return sum(self.sizes) - 1
+
+    def locate(self, offset: int, ends: list[int]) -> tuple[int, int, int]:
+        """The block, the line within it and the line's start for an offset."""
+        b = bisect_right(ends, offset)
+        start = ends[b - 1] if b else 0
+
+        block = self.blocks[b]
+        i = 0
+        while start + len(block[i].text) < offset:
+            start += len(block[i].text) + 1
+            i += 1
+        return b, i, start
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> range:
+        """
+        Replaces `deleted` characters at `offset` with `inserted`, and returns
+        the numbers of the lines that were compiled again.
+        """
+        if offset < 0 or deleted < 0 or offset + deleted > len(self):
+            raise ValueError(f"Edit at {offset}+{deleted} is outside the document")
+
+        ends = list(accumulate(self.sizes))
+        first_block, first, start = self.locate(offset, ends)
+        last_block, last, _ = self.locate(offset + deleted, ends)
+
+        old_lines = self.blocks[first_block][first:]
+        for block in self.blocks[first_block + 1 : last_block + 1]:
+            old_lines.extend(block)
+        del old_lines[len(old_lines) - len(self.blocks[last_block]) + last + 1 :]
+
+        old = "\n".join(line.text for line in old_lines)
+        col = offset - start
+        new = old[:col] + inserted + old[col + deleted :]
+
+        ln = sum(map(len, self.blocks[:first_block])) + first
+        lines = [self.make_line(text, ln + i) for i, text in enumerate(new.split("\n"))]
+
+        merged = (
+            self.blocks[first_block][:first]
+            + lines
+            + self.blocks[last_block][last + 1 :]
+        )
+        end_block = last_block + 1
+        # Blocks emptied by deletions are merged into the next one
+        if len(merged) < BLOCK_SIZE // 2 and end_block < len(self.blocks):
+            merged += self.blocks[end_block]
+            end_block += 1
+
+        blocks = [
+            merged[i : i + BLOCK_SIZE] for i in range(0, len(merged), BLOCK_SIZE)
+        ]
+        self.blocks[first_block:end_block] = blocks
+        self.sizes[first_block:end_block] = [block_size(block) for block in blocks]
+
+        return range(ln, ln + len(lines))
+
+    def errors(self) -> list[Error]:
+        errors = []
+        for ln, line in enumerate(self.lines):
+            if line.error:
+                line.source.line_base = ln
+                errors.append(line.error)
+        return errors
+
+    def run(self, session: Session, engine: str = "interpreter"):
+        """Runs every statement in order, returning (value, error) per line."""
+        results = []
+        for ln, line in enumerate(self.lines):
+            line.source.line_base = ln
+            if line.error:
+                results.append(([], line.error))
+            elif line.program is None:
+                results.append((None, None))
+            else:
+                results.append(session.execute(line.program, engine))
+        return results
+
+
+def block_size(block: list[Line]) -> int:
+    return sum(len(line.text) + 1 for line in block)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from src.nodes import (
+    NumberNode,
+    VarAccessNode,
+    VarAssignNode,
+    node_children,
+    postorder,
+)
+
+
+class Numbering:
+    """
+    Every node of a tree in post-order, with the hash-consed id of each and
+    the number of nodes in its subtree, so children can be found by index.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: list = []
+        self.ids: list[int] = []
+        self.sizes: list[int] = []
+
+    def children(self, i: int) -> tuple[int, ...]:
+        count = len(node_children(self.nodes[i]))
+        if count == 0:
+            return ()
+        if count == 1:
+            return (i - 1,)
+        right = i - 1
+        return (right - self.sizes[right], right)
+
+
+class Interner:
+    """
+    Hash-conses expression trees, so structurally identical subtrees get
+    the same integer id and comparing two subtrees costs a single lookup.
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict[tuple, int] = {}
+
+    def cons(self, key: tuple) -> int:
+        return self.ids.setdefault(key, len(self.ids))
+
+    def number(self, root, versioned: bool = False) -> Numbering:
+        """
+        With `versioned`, a variable read after an assignment to it gets a
+        different id than one read before, and subtrees containing an
+        assignment never share an id, so equal ids always mean equal values
+        within one run.
+        """
+        numbering = Numbering()
+        versions: dict[str, int] = {}
+        # (id, size, pure) of each subtree whose parent is still to come
+        results: list[tuple[int, int, bool]] = []
+
+        for node in postorder(root):
+            count = len(node_children(node))
+            children = results[len(results) - count :]
+            del results[len(results) - count :]
+
+            size = 1 + sum(child[1] for child in children)
+            pure = all(child[2] for child in children)
+            child_ids = tuple(child[0] for child in children)
+
+            if isinstance(node, NumberNode):
+                value = node.tok.value
+                if isinstance(value, float):
+                    # Keeps -0.0 apart from 0.0
+                    value = value.hex()
+                key = ("number", type(node.tok.value).__name__, value)
+            elif isinstance(node, VarAccessNode):
+                name = str(node.var_name_tok.value)
+                key = ("access", name, versions.get(name, 0) if versioned else 0)
+            elif isinstance(node, VarAssignNode):
+                name = str(node.var_name_tok.value)
+                key = ("assign", name, child_ids)
+                if versioned:
+                    versions[name] = versions.get(name, 0) + 1
+                    pure = False
+            else:
+                key = (type(node).__name__, node.op_tok.type, child_ids)
+
+            if not pure:
+                key = ("impure", len(numbering.nodes))
+
+            numbering.nodes.append(node)
+            numbering.ids.append(self.cons(key))
+            numbering.sizes.append(size)
+            results.append((numbering.ids[-1], size, pure))
+
+        return numbering
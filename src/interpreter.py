@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+from time import perf_counter
+from typing import TYPE_CHECKING
+
 from src.nodes import BinOpNode, NumberNode, UnaryOpNode, VarAccessNode, VarAssignNode
-from src.error import RTError
+from src.error import LimitExceededError, RTError
+from src.limits import Budget, Limits
 from src.token import TokenType
 from src.values import Number
 
+if TYPE_CHECKING:
+    from src.profiler import Instrument
+
 
 class SymbolTable:
     def __init__(self, parent: SymbolTable = None):
@@ -47,15 +54,157 @@ class RunTimeResult:
         return self
 
 
+class RunTimeAbort(Exception):
+    def __init__(self, error: RTError) -> None:
+        super().__init__(error.details)
+        self.error = error
+
+
+def value_span(node):
+    """
+    The span carried by the value a node evaluates to. An assignment
+    evaluates to its right hand side's value, which keeps that span.
+    """
+    while type(node) is VarAssignNode:
+        node = node.value_node
+    return node.pos_start, node.pos_end
+
+
 class Interpreter:
+    def __init__(
+        self, instrument: Instrument | None = None, budget: Budget | None = None
+    ) -> None:
+        self.instrument = instrument
+        self.budget = budget
+
+        # Instruments and step counting need a hook around every node, so
+        # they run on the boxed path. Swapping the methods in only then keeps
+        # both paths free of any checks otherwise.
+        if instrument is not None:
+            self.visit_node = self.visit_instrumented  # type: ignore
+            self.visit = self.visit_node  # type: ignore
+        elif budget is not None and budget.counts_steps:
+            self.visit_node = self.visit_budgeted  # type: ignore
+            self.visit = self.visit_node  # type: ignore
+
     def visit(self, node: UnaryOpNode | BinOpNode | NumberNode, context: Context):
+        """
+        Evaluates the tree on raw ints and floats, only building a Number
+        for the final value or a position for an error.
+        """
+        res = RunTimeResult()
+        try:
+            value = self.compute(node, context)
+        except RunTimeAbort as abort:
+            return res.failure(abort.error)
+
+        return res.success(
+            Number(value).set_context(context).set_pos(node.pos_start, node.pos_end)
+        )
+
+    def visit_node(self, node, context: Context):
+        """Evaluates one node, with every intermediate value boxed in a Number."""
         method_name = f"visit_{type(node).__name__}"
         method = getattr(self, method_name, self.no_visit_method)
         return method(node, context)
 
+    def visit_budgeted(self, node, context: Context):
+        budget = self.budget
+        budget.steps += 1  # type: ignore
+        if budget.steps >= budget.next_check:  # type: ignore
+            details = budget.check()  # type: ignore
+            if details:
+                return RunTimeResult().failure(
+                    LimitExceededError(details, node.pos_start, node.pos_end, context)
+                )
+
+        method_name = f"visit_{type(node).__name__}"
+        method = getattr(self, method_name, self.no_visit_method)
+        return method(node, context)
+
+    def visit_instrumented(self, node, context: Context):
+        if self.budget is not None and self.budget.counts_steps:
+            method = self.visit_budgeted
+        else:
+            method_name = f"visit_{type(node).__name__}"
+            method = getattr(self, method_name, self.no_visit_method)
+
+        instrument = self.instrument
+        instrument.enter(node)  # type: ignore
+        start = perf_counter()
+        try:
+            return method(node, context)
+        finally:
+            instrument.exit(node, perf_counter() - start)  # type: ignore
+
     def no_visit_method(self, node, context: Context):
         raise Exception(f"No visit_{type(node).__name__} method defined")
 
+    def compute(self, node, context: Context):
+        if type(node) is BinOpNode:
+            return self.compute_BinOpNode(node, context)
+        if type(node) is NumberNode:
+            return node.tok.value
+        if type(node) is VarAccessNode:
+            return self.compute_VarAccessNode(node, context)
+        if type(node) is UnaryOpNode:
+            value = self.compute(node.node, context)
+            return value * -1 if node.op_tok.type == TokenType.MINUS else value
+        if type(node) is VarAssignNode:
+            return self.compute_VarAssignNode(node, context)
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    def compute_BinOpNode(self, node: BinOpNode, context: Context):
+        left = self.compute(node.left_node, context)
+        right = self.compute(node.right_node, context)
+        op = node.op_tok.type
+
+        if op == TokenType.PLUS:
+            return left + right
+        if op == TokenType.MINUS:
+            return left - right
+
+        if self.budget is not None and (op == TokenType.MUL or op == TokenType.POW):
+            if op == TokenType.MUL:
+                details = self.budget.check_mul(left, right)
+            else:
+                details = self.budget.check_pow(left, right)
+            if details:
+                raise RunTimeAbort(
+                    LimitExceededError(details, *value_span(node.right_node), context)
+                )
+
+        if op == TokenType.MUL:
+            return left * right
+        if op == TokenType.POW:
+            return left**right
+
+        if right == 0:
+            raise RunTimeAbort(
+                RTError("Division by zero", *value_span(node.right_node), context)
+            )
+        return left / right
+
+    def compute_VarAccessNode(self, node: VarAccessNode, context: Context):
+        var_name = str(node.var_name_tok.value)
+        value = context.symbol_table.get(var_name)
+
+        if not value:
+            raise RunTimeAbort(
+                RTError(
+                    f"{var_name} is not defined", node.pos_start, node.pos_end, context
+                )
+            )
+        return value.value
+
+    def compute_VarAssignNode(self, node: VarAssignNode, context: Context):
+        value = self.compute(node.value_node, context)
+        context.symbol_table.set(
+            str(node.var_name_tok.value),
+            Number(value).set_context(context).set_pos(*value_span(node.value_node)),
+        )
+        return value
+
     def visit_NumberNode(self, node: NumberNode, context: Context):
         return RunTimeResult().success(
             Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)  # type: ignore
@@ -63,14 +212,26 @@ class Interpreter:
 
     def visit_BinOpNode(self, node: BinOpNode, context: Context):
         res = RunTimeResult()
-        left = res.register(self.visit(node.left_node, context))
+        left = res.register(self.visit_node(node.left_node, context))
         if res.error:
             return res
-        right = res.register(self.visit(node.right_node, context))
-        print(node.right_node)
+        right = res.register(self.visit_node(node.right_node, context))
         if res.error:
             return res
 
+        if self.budget is not None:
+            details = None
+            if node.op_tok.type == TokenType.POW:
+                details = self.budget.check_pow(left.value, right.value)
+            elif node.op_tok.type == TokenType.MUL:
+                details = self.budget.check_mul(left.value, right.value)
+
+            if details:
+                # Reported at the right operand's value, like division by zero
+                return res.failure(
+                    LimitExceededError(details, *value_span(node.right_node), context)
+                )
+
         if node.op_tok.type == TokenType.PLUS:
             result, error = left.add(right)
         if node.op_tok.type == TokenType.MINUS:
@@ -89,7 +250,7 @@ class Interpreter:
 
     def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context):
         res = RunTimeResult()
-        number = res.register(self.visit(node.node, context))
+        number = res.register(self.visit_node(node.node, context))
         if res.error:
             return res
 
@@ -120,7 +281,7 @@ class Interpreter:
     def visit_VarAssignNode(self, node: VarAssignNode, context: Context):
         res = RunTimeResult()
         var_name = str(node.var_name_tok.value)
-        value = res.register(self.visit(node.value_node, context))
+        value = res.register(self.visit_node(node.value_node, context))
         if res.error:
             return res
 
@@ -137,3 +298,4 @@ class Context:
         self.parent = parent
 
         self.symbol_table: SymbolTable = None  # type: ignore
+        self.limits: Limits | None = None
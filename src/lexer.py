@@ -1,102 +1,110 @@
+import re
+
 from src.error import IllegalCharError
 from src.position import Position
+from src.source import SourceFile
 from src.token import KEYWORDS, Token, TokenType
 from src.consts import DIGITS, LETTERS, LETTERS_DIGITS
 
+SINGLE_CHAR_TOKENS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MUL,
+    "/": TokenType.DIV,
+    "^": TokenType.POW,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "=": TokenType.EQUAL,
+}
+
+# Each match is one token with the blanks in front of it, and every character
+# matches some group so scanning never skips input
+TOKEN_REGEX = re.compile(
+    rf"""
+    [ \t]*
+    (?:
+        (?P<float>[{DIGITS}]+\.[{DIGITS}]*)
+        | (?P<int>[{DIGITS}]+)
+        | (?P<identifier>[{LETTERS}][{LETTERS_DIGITS}_]*)
+        | (?P<single>[{re.escape("".join(SINGLE_CHAR_TOKENS))}])
+        | (?P<illegal>.)
+        | (?P<eof>\Z)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+FLOAT, INT, IDENTIFIER, SINGLE, ILLEGAL, EOF = range(1, 7)
+
+# Only short literals are shared, and only this many of them, so generated
+# input full of distinct numbers doesn't grow the cache
+SMALL_LITERAL = 4
+CONSTANTS_LIMIT = 256
+
 
 class Lexer:
-    def __init__(self, fn: str, text: str) -> None:
+    def __init__(self, fn: str, text: str, source: SourceFile | None = None) -> None:
         self.text = text
         self.fn = fn
+        self.source = SourceFile(fn, text) if source is None else source
 
-        self.pos = Position(-1, 0, -1, fn, text)
-        self.current_char = None
-        self.advance()
-
-    def advance(self):
-        self.pos.advance(self.current_char)
-        self.current_char = (
-            self.text[self.pos.idx] if self.pos.idx < len(self.text) else None
-        )
+        self.error: IllegalCharError | None = None
+        self.constants: dict[str, int | float] = {}
 
     def make_tokens(self):
-        tokens = []
-        while self.current_char is not None:
-            if self.current_char in " \t":
-                self.advance()
-
-            elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
-            elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
-
-            elif self.current_char == "+":
-                tokens.append(Token(TokenType.PLUS, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "-":
-                tokens.append(Token(TokenType.MINUS, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "*":
-                tokens.append(Token(TokenType.MUL, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "/":
-                tokens.append(Token(TokenType.DIV, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "^":
-                tokens.append(Token(TokenType.POW, pos_start=self.pos))
-                self.advance()
+        tokens = list(self.generate_tokens())
 
-            elif self.current_char == "(":
-                tokens.append(Token(TokenType.LPAREN, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token(TokenType.RPAREN, pos_start=self.pos))
-                self.advance()
-
-            elif self.current_char == "=":
-                tokens.append(Token(TokenType.EQUAL, pos_start=self.pos))
-                self.advance()
+        if self.error:
+            return [], self.error
+        return tokens, None
 
+    def generate_tokens(self):
+        """
+        Lazily yields tokens, ending with an EOF token. An illegal character
+        is recorded in `self.error` and ends the stream with an EOF token at
+        its position, so a parser pulling from it stops there.
+        """
+        text, source = self.text, self.source
+        make_token = Token.from_span
+        # Repeated small literals share one value object instead of being
+        # parsed again
+        constants = self.constants
+
+        for match in TOKEN_REGEX.finditer(text):
+            kind = match.lastindex
+            start = match.start(kind)
+            end = match.end()
+            value = match.group(kind)
+
+            if kind == SINGLE:
+                yield make_token(SINGLE_CHAR_TOKENS[value], None, start, end, source)
+            elif kind == INT:
+                number = constants.get(value)
+                if number is None:
+                    number = int(value)
+                    if len(value) <= SMALL_LITERAL and len(constants) < CONSTANTS_LIMIT:
+                        constants[value] = number
+                yield make_token(TokenType.INT, number, start, end, source)
+            elif kind == IDENTIFIER:
+                tok_type = (
+                    TokenType.KEYWORD if value in KEYWORDS else TokenType.IDENTIFIER
+                )
+                yield make_token(tok_type, value, start, end, source)
+            elif kind == FLOAT:
+                number = constants.get(value)
+                if number is None:
+                    number = float(value)
+                    if len(value) <= SMALL_LITERAL and len(constants) < CONSTANTS_LIMIT:
+                        constants[value] = number
+                yield make_token(TokenType.FLOAT, number, start, end, source)
+            elif kind == EOF:
+                yield make_token(TokenType.EOF, None, start, start + 1, source)
+                return
             else:
-                pos_start = self.pos.copy()
-
-                char = self.current_char
-                self.advance()
-
-                return [], IllegalCharError(
-                    f'"{char}" is not a valid character', pos_start, self.pos
+                self.error = IllegalCharError(
+                    f'"{value}" is not a valid character',
+                    Position(start, source),
+                    Position(end, source),
                 )
-        tokens.append(Token(TokenType.EOF, pos_start=self.pos))
-        return tokens, None
-
-    def make_number(self):
-        num_str = ""
-        dot_count = 0
-        pos_start = self.pos.copy()
-
-        while self.current_char != None and self.current_char in DIGITS + ".":
-            if self.current_char == ".":
-                dot_count += 1
-
-                if dot_count > 1:
-                    break
-
-            num_str += self.current_char
-            self.advance()
-
-        if dot_count == 0:
-            return Token(TokenType.INT, int(num_str), pos_start, self.pos)
-        else:
-            return Token(TokenType.FLOAT, float(num_str), pos_start, self.pos)
-
-    def make_identifier(self):
-        id_str = ""
-        pos_start = self.pos.copy()
-
-        while self.current_char != None and self.current_char in LETTERS_DIGITS + "_":
-            id_str += self.current_char
-            self.advance()
-
-        tok_type = TokenType.KEYWORD if id_str in KEYWORDS else TokenType.IDENTIFIER
-
-        return Token(tok_type, id_str, pos_start, self.pos)
+                yield make_token(TokenType.EOF, None, start, end, source)
+                return
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from time import perf_counter
+
+# Large enough for any sensible formula, small enough to compute in milliseconds
+DEFAULT_MAX_INT_BITS = 1 << 20
+
+# Steps run between checks of the clock
+CHECK_INTERVAL = 1024
+
+
+class Limits:
+    """
+    Bounds on a single evaluation. `None` disables a limit. Set on a Context
+    (or passed to a Session) to apply to every run that uses it.
+    """
+
+    def __init__(
+        self,
+        max_steps: int | None = None,
+        max_time: float | None = None,
+        max_int_bits: int | None = DEFAULT_MAX_INT_BITS,
+    ) -> None:
+        # AST nodes evaluated, counted the same way by every engine; where
+        # the limit is reported can differ, since the VM runs in post-order
+        self.max_steps = max_steps
+        # Seconds of wall time
+        self.max_time = max_time
+        self.max_int_bits = max_int_bits
+
+    @property
+    def counts_steps(self) -> bool:
+        return self.max_steps is not None or self.max_time is not None
+
+
+class Budget:
+    """
+    What is left of the Limits during one run. Engines add to `steps` as they
+    go and only call `check` once `steps` reaches `next_check`, so the clock
+    is read every CHECK_INTERVAL steps at most.
+    """
+
+    __slots__ = (
+        "counts_steps",
+        "max_steps",
+        "max_time",
+        "max_int_bits",
+        "deadline",
+        "steps",
+        "next_check",
+    )
+
+    def __init__(self, limits: Limits) -> None:
+        self.max_steps = limits.max_steps
+        self.max_time = limits.max_time
+        self.max_int_bits = limits.max_int_bits
+        self.counts_steps = limits.counts_steps
+
+        self.deadline = None
+        if limits.max_time is not None:
+            self.deadline = perf_counter() + limits.max_time
+
+        self.steps = 0
+        self.next_check = self.schedule()
+
+    def schedule(self) -> int:
+        next_check = self.steps + CHECK_INTERVAL
+        if self.max_steps is not None:
+            next_check = min(next_check, self.max_steps + 1)
+        return next_check
+
+    def check(self) -> str | None:
+        if self.max_steps is not None and self.steps > self.max_steps:
+            return f"Step limit of {self.max_steps} exceeded"
+        if self.deadline is not None and perf_counter() > self.deadline:
+            return f"Time limit of {self.max_time}s exceeded"
+
+        self.next_check = self.schedule()
+        return None
+
+    def check_pow(self, base, exponent) -> str | None:
+        # Estimated from the operands so the power is never computed
+        if (
+            self.max_int_bits is None
+            or type(base) is not int
+            or type(exponent) is not int
+            or exponent <= 0
+            or -1 <= base <= 1
+        ):
+            return None
+
+        # Any base above 1 doubles at least every step of the exponent, which
+        # also keeps exponents too large for a float out of the estimate
+        if (
+            exponent > self.max_int_bits
+            or exponent * math.log2(abs(base)) > self.max_int_bits
+        ):
+            return f"Result of ^ would exceed {self.max_int_bits} bits"
+        return None
+
+    def check_mul(self, left, right) -> str | None:
+        if (
+            self.max_int_bits is not None
+            and type(left) is int
+            and type(right) is int
+            and left.bit_length() + right.bit_length() > self.max_int_bits + 1
+        ):
+            return f"Result of * would exceed {self.max_int_bits} bits"
+        return None
+
+
+def start_budget(limits: Limits | None) -> Budget | None:
+    return None if limits is None else Budget(limits)
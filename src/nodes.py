@@ -3,6 +3,8 @@ from src.token import Token
 
 
 class NumberNode:
+    __slots__ = ("tok", "pos_start", "pos_end")
+
     def __init__(self, tok: Token) -> None:
         self.tok = tok
 
@@ -14,6 +16,8 @@ class NumberNode:
 
 
 class BinOpNode:
+    __slots__ = ("left_node", "op_tok", "right_node", "pos_start", "pos_end")
+
     def __init__(
         self,
         left_node: BinOpNode | NumberNode | UnaryOpNode,
@@ -32,6 +36,8 @@ class BinOpNode:
 
 
 class UnaryOpNode:
+    __slots__ = ("op_tok", "node", "pos_start", "pos_end")
+
     def __init__(self, op_tok: Token, node: UnaryOpNode | NumberNode) -> None:
         self.op_tok = op_tok
         self.node = node
@@ -44,6 +50,8 @@ class UnaryOpNode:
 
 
 class VarAccessNode:
+    __slots__ = ("var_name_tok", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok: Token) -> None:
         self.var_name_tok = var_name_tok
 
@@ -55,9 +63,44 @@ class VarAccessNode:
 
 
 class VarAssignNode:
+    __slots__ = ("var_name_tok", "value_node", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok: Token, value_node) -> None:
         self.var_name_tok = var_name_tok
         self.value_node = value_node
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.value_node.pos_end
+
+
+def node_token(node) -> Token:
+    if isinstance(node, NumberNode):
+        return node.tok
+    if isinstance(node, (VarAccessNode, VarAssignNode)):
+        return node.var_name_tok
+    return node.op_tok
+
+
+def node_children(node) -> tuple:
+    if isinstance(node, BinOpNode):
+        return (node.left_node, node.right_node)
+    if isinstance(node, UnaryOpNode):
+        return (node.node,)
+    if isinstance(node, VarAssignNode):
+        return (node.value_node,)
+    return ()
+
+
+def postorder(root):
+    """Yields every node of the tree, children before parents, without recursing."""
+    stack = [(root, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        children = node_children(node)
+
+        if children and not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+        else:
+            yield node
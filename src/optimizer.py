@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from src.nodes import (
+    BinOpNode,
+    NumberNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    node_children,
+    postorder,
+)
+from src.interpreter import value_span
+from src.token import Token, TokenType
+
+# Integer products and powers are only folded while the result stays this
+# small. Larger ones are left for the engines, which check them against the
+# running session's Limits; a folded program is shared between sessions
+# through the cache, so it must not depend on any one session's limit.
+MAX_FOLD_BITS = 64
+
+
+def fits(value) -> bool:
+    return type(value) is not int or value.bit_length() <= MAX_FOLD_BITS
+
+
+def fold(op: str, left: int | float, right: int | float):
+    if op == TokenType.PLUS:
+        return left + right
+    if op == TokenType.MINUS:
+        return left - right
+    if op == TokenType.MUL:
+        if (
+            isinstance(left, int)
+            and isinstance(right, int)
+            and left.bit_length() + right.bit_length() > MAX_FOLD_BITS + 1
+        ):
+            return None
+        return left * right
+    if op == TokenType.DIV:
+        if right == 0:
+            return None
+        return left / right
+    if op == TokenType.POW:
+        if (
+            isinstance(left, int)
+            and isinstance(right, int)
+            and right > 0
+            and left.bit_length() * right > MAX_FOLD_BITS + right
+        ):
+            return None
+        result = left**right
+        return result if fits(result) else None
+    return None
+
+
+def is_constant(node, value: int) -> bool:
+    return (
+        isinstance(node, NumberNode)
+        and type(node.tok.value) is int
+        and node.tok.value == value
+    )
+
+
+def keep_span(node, original):
+    """
+    Returns `node`, which replaced `original`, as a node whose value has the
+    span of the value of `original`, where division by zero and limit errors
+    are reported.
+    """
+    if value_span(node) == value_span(original):
+        return node
+
+    if isinstance(node, VarAssignNode) and isinstance(original, VarAssignNode):
+        return VarAssignNode(
+            node.var_name_tok, keep_span(node.value_node, original.value_node)
+        )
+
+    # Unary plus evaluates to its operand, at its own span
+    plus = Token(TokenType.PLUS, None, original.pos_start, original.pos_end)
+    wrapper = UnaryOpNode(plus, node)
+    wrapper.pos_end = original.pos_end
+    return wrapper
+
+
+class Optimizer:
+    def visit(self, root):
+        # Nodes are rewritten bottom-up, each one taking the rewritten
+        # versions of its children off the results stack
+        results: list = []
+
+        for node in postorder(root):
+            arity = len(node_children(node))
+            children = results[len(results) - arity :]
+            del results[len(results) - arity :]
+
+            method_name = f"visit_{type(node).__name__}"
+            method = getattr(self, method_name, self.no_visit_method)
+            results.append(method(node, *children))
+
+        return results.pop()
+
+    def no_visit_method(self, node, *children):
+        raise Exception(f"No visit_{type(node).__name__} method defined")
+
+    def visit_NumberNode(self, node: NumberNode):
+        return node
+
+    def visit_VarAccessNode(self, node: VarAccessNode):
+        return node
+
+    def visit_VarAssignNode(self, node: VarAssignNode, value_node):
+        if value_node is node.value_node:
+            return node
+
+        return VarAssignNode(node.var_name_tok, value_node)
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode, operand):
+        op = node.op_tok.type
+
+        if op == TokenType.MINUS and isinstance(operand, NumberNode):
+            return self.constant(-operand.tok.value, node)  # type: ignore
+
+        # +x, --x
+        if op == TokenType.PLUS:
+            return operand
+        if isinstance(operand, UnaryOpNode) and operand.op_tok.type == op:
+            return operand.node
+
+        if operand is node.node:
+            return node
+        return UnaryOpNode(node.op_tok, operand)
+
+    def visit_BinOpNode(self, node: BinOpNode, left, right):
+        op = node.op_tok.type
+
+        if isinstance(left, NumberNode) and isinstance(right, NumberNode):
+            try:
+                value = fold(op, left.tok.value, right.tok.value)  # type: ignore
+            except (ArithmeticError, ValueError):
+                value = None
+
+            if isinstance(value, (int, float)):
+                return self.constant(value, node)
+
+        # x*1, 1*x, x-0, x^1
+        # x+0 is left alone since -0.0 + 0 evaluates to 0.0
+        if (
+            (op == TokenType.MUL and is_constant(right, 1))
+            or (op == TokenType.MINUS and is_constant(right, 0))
+            or (op == TokenType.POW and is_constant(right, 1))
+        ):
+            return left
+        if op == TokenType.MUL and is_constant(left, 1):
+            return right
+
+        # Simplified operands report their own spans, errors raised by this
+        # operation must still point at the whole right operand's value
+        if op in (TokenType.DIV, TokenType.MUL, TokenType.POW):
+            right = keep_span(right, node.right_node)
+
+        if left is node.left_node and right is node.right_node:
+            return node
+        return BinOpNode(left, node.op_tok, right)
+
+    @staticmethod
+    def constant(value: int | float, node):
+        tok_type = TokenType.INT if isinstance(value, int) else TokenType.FLOAT
+        return NumberNode(Token(tok_type, value, node.pos_start, node.pos_end))
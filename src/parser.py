@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Iterable
 
 from src.error import InvalidSyntaxError
 from src.nodes import BinOpNode, NumberNode, UnaryOpNode, VarAccessNode, VarAssignNode
 from src.token import TokenType, Token
 
+# Binding power of each binary operator, higher binds tighter
+BINARY_PRECEDENCE = {
+    TokenType.PLUS: 1,
+    TokenType.MINUS: 1,
+    TokenType.MUL: 2,
+    TokenType.DIV: 2,
+    TokenType.POW: 4,
+}
+RIGHT_ASSOCIATIVE = (TokenType.POW,)
+
+# Prefix + and - bind tighter than * and /, but their operand may contain ^
+PREFIX_PRECEDENCE = 3
+
+# The construct that opened an expression, and so decides how it must end
+TOP, PAREN, ASSIGN = range(3)
+
 
 class ParseResult:
     def __init__(self) -> None:
@@ -32,151 +48,164 @@ class ParseResult:
         return self
 
 
-class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
-        self.tokens = tokens
-        self.tok_idx = -1
-        self.current_tok = self.advance()
+class ExprFrame:
+    """The operand and operator stacks of one expression being parsed."""
 
-    def advance(self):
-        self.tok_idx += 1
-        if self.tok_idx < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_idx]
-        return self.current_tok
+    __slots__ = ("kind", "start_idx", "var_name_tok", "operands", "operators")
 
-    def atom(self):
-        res = ParseResult()
-        tok = self.current_tok
+    def __init__(self, kind: int, start_idx: int, var_name_tok: Token = None) -> None:
+        self.kind = kind
+        self.start_idx = start_idx
+        self.var_name_tok = var_name_tok
 
-        if tok.type in (TokenType.INT, TokenType.FLOAT):
-            res.register_advancement()
-            self.advance()
-            return res.success(NumberNode(tok))
+        self.operands: list = []
+        # (operator token, precedence, is prefix operator)
+        self.operators: list[tuple[Token, int, bool]] = []
 
-        if tok.type == TokenType.IDENTIFIER:
-            res.register_advancement()
-            self.advance()
-            return res.success(VarAccessNode(tok))
+    def reduce(self, precedence: int, right_associative: bool = False):
+        """Builds nodes for stacked operators that bind tighter than `precedence`."""
+        operands, operators = self.operands, self.operators
 
-        elif tok.type == TokenType.LPAREN:
-            res.register_advancement()
-            self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-            if self.current_tok.type == TokenType.RPAREN:
-                res.register_advancement()
-                self.advance()
-                return res.success(expr)
-            else:
-                return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected ')'",
-                    )
-                )
-        return res.failure(
-            InvalidSyntaxError(
-                "Expected int, float, identifier, '+', '-' or '('",
-                tok.pos_start,
-                tok.pos_end,
-            )
-        )
+        while operators:
+            op_tok, op_precedence, prefix = operators[-1]
+            if op_precedence < precedence or (
+                op_precedence == precedence and right_associative
+            ):
+                break
 
-    def factor(self):
-        tok = self.current_tok
-        res = ParseResult()
-
-        if tok.type in (TokenType.PLUS, TokenType.MINUS):
-            res.register_advancement()
-            self.advance()
-            factor = res.register(self.factor())
+            operators.pop()
+            if prefix:
+                operands.append(UnaryOpNode(op_tok, operands.pop()))
+            else:
+                right = operands.pop()
+                operands.append(BinOpNode(operands.pop(), op_tok, right))
 
-            if res.error:
-                return res
 
-            return res.success(UnaryOpNode(tok, factor))
+class Parser:
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        # Tokens are pulled one at a time, `current_tok` is the only lookahead
+        self.tokens = iter(tokens)
+        self.tok_idx = -1
+        self.current_tok: Token = None  # type: ignore
+        self.advance()
 
-        return self.power()
+    def advance(self):
+        self.tok_idx += 1
+        # Once the stream runs out the parser stays on its final EOF token
+        self.current_tok = next(self.tokens, self.current_tok)
+        return self.current_tok
 
-    def power(self):
-        return self.bin_op((TokenType.POW), self.atom, self.factor)
+    def expr(self):
+        """
+        Parses an expression by precedence climbing, keeping the pending
+        operators of every open parenthesis or assignment on an explicit
+        stack so arbitrarily deep input uses a fixed amount of Python stack.
+        """
+        res = ParseResult()
+        frames: list[ExprFrame] = []
+        frame = ExprFrame(TOP, self.tok_idx)
 
-    def bin_op(self, operators: tuple[str], func_a: Callable, func_b: Callable = None):
-        if func_b is None:
-            func_b = func_a
+        while True:
+            # Expecting an operand, possibly preceded by prefix operators
+            tok = self.current_tok
 
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
+            if self.tok_idx == frame.start_idx and (
+                tok.matches(TokenType.KEYWORD, "var")
+                or tok.matches(TokenType.KEYWORD, "let")
+            ):
+                self.advance()
 
-        while self.current_tok.type in operators:
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
+                if self.current_tok.type != TokenType.IDENTIFIER:
+                    return res.failure(
+                        InvalidSyntaxError(
+                            "Expected identifier",
+                            self.current_tok.pos_start,
+                            self.current_tok.pos_end,
+                        )
+                    )
 
-        return res.success(left)
+                var_name = self.current_tok
+                self.advance()
 
-    def term(self):
-        return self.bin_op((TokenType.MUL, TokenType.DIV), self.factor)
+                if self.current_tok.type != TokenType.EQUAL:
+                    return res.failure(
+                        InvalidSyntaxError(
+                            "Expected '='",
+                            self.current_tok.pos_start,
+                            self.current_tok.pos_end,
+                        )
+                    )
 
-    def expr(self):
-        res = ParseResult()
+                self.advance()
+                frames.append(frame)
+                frame = ExprFrame(ASSIGN, self.tok_idx, var_name)
+                continue
 
-        if self.current_tok.matches(
-            TokenType.KEYWORD, "var"
-        ) or self.current_tok.matches(TokenType.KEYWORD, "let"):
-            res.register_advancement()
-            self.advance()
+            if tok.type in (TokenType.PLUS, TokenType.MINUS):
+                frame.operators.append((tok, PREFIX_PRECEDENCE, True))
+                self.advance()
+                continue
 
-            if self.current_tok.type != TokenType.IDENTIFIER:
+            if tok.type == TokenType.LPAREN:
+                self.advance()
+                frames.append(frame)
+                frame = ExprFrame(PAREN, self.tok_idx)
+                continue
+
+            if tok.type in (TokenType.INT, TokenType.FLOAT):
+                frame.operands.append(NumberNode(tok))
+            elif tok.type == TokenType.IDENTIFIER:
+                frame.operands.append(VarAccessNode(tok))
+            elif self.tok_idx == frame.start_idx:
                 return res.failure(
                     InvalidSyntaxError(
-                        "Expected identifier",
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
+                        "Expected 'var', 'let', 'int', 'float', '+', '-', or '('",
+                        tok.pos_start,
+                        tok.pos_end,
                     )
                 )
-
-            var_name = self.current_tok
-
-            res.register_advancement()
-            self.advance()
-
-            if self.current_tok.type != TokenType.EQUAL:
+            else:
                 return res.failure(
                     InvalidSyntaxError(
-                        "Expected '='",
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
+                        "Expected int, float, identifier, '+', '-' or '('",
+                        tok.pos_start,
+                        tok.pos_end,
                     )
                 )
-
-            res.register_advancement()
             self.advance()
 
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-
-            return res.success(VarAssignNode(var_name, expr))
-
-        node = res.register(self.bin_op((TokenType.PLUS, TokenType.MINUS), self.term))
-        if res.error:
-            return res.failure(
-                InvalidSyntaxError(
-                    "Expected 'var', 'let', 'int', 'float', '+', '-', or '('",
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                )
-            )
-        return res.success(node)
+            # Expecting a binary operator, or the end of the current expression
+            while True:
+                tok = self.current_tok
+                precedence = BINARY_PRECEDENCE.get(tok.type)  # type: ignore
+
+                if precedence is not None:
+                    frame.reduce(precedence, tok.type in RIGHT_ASSOCIATIVE)
+                    frame.operators.append((tok, precedence, False))
+                    self.advance()
+                    break
+
+                frame.reduce(0)
+                node = frame.operands.pop()
+
+                if frame.kind == TOP:
+                    return res.success(node)
+
+                if frame.kind == PAREN:
+                    if tok.type != TokenType.RPAREN:
+                        return res.failure(
+                            InvalidSyntaxError(
+                                "Expected ')'",
+                                tok.pos_start,
+                                tok.pos_end,
+                            )
+                        )
+                    self.advance()
+                else:
+                    node = VarAssignNode(frame.var_name_tok, node)
+
+                frame = frames.pop()
+                frame.operands.append(node)
 
     def parse(self):
         res = self.expr()
@@ -0,0 +1,160 @@
+"""
+Evaluates many independent scripts across processes.
+
+    python -m src.pool script.bas ... [--workers N] [--chunksize N] [--engine vm]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cache import ProgramCache
+from src.program import ENGINES
+from src.session import Session
+
+# Set up once per worker process by `init_worker`
+worker_cache: ProgramCache = None  # type: ignore
+worker_engine = "interpreter"
+
+
+class ScriptResult:
+    __slots__ = ("value", "error")
+
+    def __init__(self, value: int | float | None, error: str | None) -> None:
+        # Only plain values and rendered errors cross the process boundary
+        self.value = value
+        self.error = error
+
+    def __repr__(self) -> str:
+        return self.error if self.error else f"{self.value}"
+
+
+class PoolReport:
+    def __init__(
+        self, results: list[ScriptResult], elapsed: float, busy: dict[int, float]
+    ) -> None:
+        self.results = results
+        self.elapsed = elapsed
+        # Seconds each worker process spent evaluating, keyed by pid
+        self.busy = busy
+
+    @property
+    def throughput(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    def utilization(self) -> dict[int, float]:
+        if not self.elapsed:
+            return {pid: 0.0 for pid in self.busy}
+        return {pid: busy / self.elapsed for pid, busy in self.busy.items()}
+
+    def summary(self) -> str:
+        errors = sum(1 for result in self.results if result.error)
+        lines = [
+            f"{len(self.results)} scripts ({errors} failed) in {self.elapsed:.3f}s, "
+            f"{self.throughput:,.0f} scripts/s"
+        ]
+        for pid, share in sorted(self.utilization().items()):
+            lines.append(f"  worker {pid}: {share:.0%} busy")
+        return "\n".join(lines)
+
+
+def init_worker(engine: str, cache_size: int):
+    global worker_cache, worker_engine
+    worker_cache = ProgramCache(cache_size)
+    worker_engine = engine
+
+
+def run_chunk(chunk: list[tuple[str, str]], files: bool):
+    start = time.perf_counter()
+    results = []
+
+    for source, fn in chunk:
+        # Every script gets fresh variables; compiled programs are shared
+        session = Session(worker_cache)
+        try:
+            if files:
+                value, error = session.run_file(source, worker_engine)
+            else:
+                value, error = session.run(source, fn, worker_engine)
+        except OSError as e:
+            results.append(ScriptResult(None, f"{source}: {e.strerror}"))
+            continue
+        except UnicodeDecodeError as e:
+            results.append(ScriptResult(None, f"{fn}: not valid UTF-8 ({e.reason})"))
+            continue
+        except Exception as e:
+            # One script crashing must not lose the results of the others
+            results.append(ScriptResult(None, f"{fn}: {type(e).__name__}: {e}"))
+            continue
+
+        if error:
+            results.append(ScriptResult(None, error.as_string()))
+        else:
+            results.append(ScriptResult(value.value if value else None, None))
+
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def run_pool(
+    items: list[tuple[str, str]],
+    files: bool = False,
+    workers: int | None = None,
+    chunksize: int | None = None,
+    engine: str = "interpreter",
+    cache_size: int = 128,
+) -> PoolReport:
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker balances load without paying IPC per script
+        chunksize = max(len(items) // (workers * 4), 1)
+
+    chunks = [items[i : i + chunksize] for i in range(0, len(items), chunksize)]
+    results: list[ScriptResult] = []
+    busy: dict[int, float] = {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(engine, cache_size)
+    ) as executor:
+        for pid, seconds, chunk_results in executor.map(
+            run_chunk, chunks, [files] * len(chunks)
+        ):
+            busy[pid] = busy.get(pid, 0.0) + seconds
+            results.extend(chunk_results)
+    elapsed = time.perf_counter() - start
+
+    return PoolReport(results, elapsed, busy)
+
+
+def evaluate_sources(texts: list[str], fn: str = "<batch>", **options) -> PoolReport:
+    return run_pool([(text, fn) for text in texts], **options)
+
+
+def evaluate_files(paths: list[str], **options) -> PoolReport:
+    return run_pool([(path, path) for path in paths], files=True, **options)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.pool")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunksize", type=int)
+    parser.add_argument("--engine", choices=ENGINES, default="interpreter")
+    args = parser.parse_args(argv)
+
+    report = evaluate_files(
+        args.paths, workers=args.workers, chunksize=args.chunksize, engine=args.engine
+    )
+
+    for path, result in zip(args.paths, report.results):
+        print(f"{path}: {result}")
+    print(report.summary(), file=sys.stderr)
+
+    return 1 if any(result.error for result in report.results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,28 @@
+from src.source import SourceFile
+
+
 class Position:
-    def __init__(
-        self, idx: int, ln: int, col: int, file_name: str, file_text: str
-    ) -> None:
+    __slots__ = ("idx", "source")
+
+    def __init__(self, idx: int, source: SourceFile) -> None:
         self.idx = idx
-        self.ln = ln
-        self.col = col
+        self.source = source
 
-        self.file_name = file_name
-        self.file_text = file_text
+    @property
+    def ln(self) -> int:
+        return self.source.line_base + self.source.line_number(self.idx)
 
-    def advance(self, current_char: str = None):
-        self.idx += 1
-        self.col += 1
+    @property
+    def col(self) -> int:
+        return self.source.line_col(self.idx)[1]
 
-        if current_char == "\n":
-            self.ln += 1
-            self.col = 0
+    @property
+    def file_name(self) -> str:
+        return self.source.name
 
-        return self
+    @property
+    def file_text(self) -> str:
+        return self.source.text
 
     def copy(self):
-        return Position(self.idx, self.ln, self.col, self.file_name, self.file_text)
+        return Position(self.idx, self.source)
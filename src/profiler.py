@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from time import perf_counter
+
+from src.nodes import BinOpNode, UnaryOpNode
+
+
+class Instrument:
+    """
+    Receives a callback around every node the Interpreter visits. Pass an
+    instance as `Interpreter(instrument=...)`; without one the Interpreter
+    runs with no instrumentation overhead at all.
+    """
+
+    def enter(self, node):
+        pass
+
+    def exit(self, node, elapsed: float):
+        pass
+
+
+def formula_label(node, limit: int = 60) -> str:
+    text = node.pos_start.file_text or node.pos_start.file_name
+    if len(text) > limit:
+        text = text[: limit - 3] + "..."
+    # `;` separates frames in folded stacks, which hold one stack per line
+    return text.replace(";", ",").replace("\n", " ")
+
+
+class ProfileEntry:
+    __slots__ = ("count", "total_time", "self_time")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+
+
+class TraceEvent:
+    __slots__ = ("label", "depth", "idx_start", "idx_end", "start", "elapsed")
+
+    def __init__(self, label: str, depth: int, node, start: float) -> None:
+        self.label = label
+        self.depth = depth
+        self.idx_start = node.pos_start.idx
+        self.idx_end = node.pos_end.idx
+        self.start = start
+        self.elapsed = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"{'  ' * self.depth}{self.label} [{self.idx_start}:{self.idx_end}] "
+            f"{self.elapsed * 1e6:.1f}us"
+        )
+
+
+class Profiler(Instrument):
+    """
+    Collects counts and cumulative time per node type and per operator,
+    self time per call stack for flamegraphs, and optionally a trace event
+    for every visited node.
+    """
+
+    def __init__(self, trace: bool = False) -> None:
+        self.node_types: dict[str, ProfileEntry] = {}
+        self.operators: dict[str, ProfileEntry] = {}
+        self.stacks: dict[str, float] = {}
+
+        self.trace = trace
+        self.events: list[TraceEvent] = []
+
+        # One entry per node being visited: [stack path, child time, trace event]
+        self.frames: list[list] = []
+        # How many visits of each key are currently open, so cumulative time
+        # is only counted once for nested nodes of the same type
+        self.active: dict[str, int] = {}
+
+    def enter(self, node):
+        name, op = self.keys(node)
+        label = op or name
+
+        if self.frames:
+            path = f"{self.frames[-1][0]};{label}"
+        else:
+            path = f"{formula_label(node)};{label}"
+
+        event = None
+        if self.trace:
+            event = TraceEvent(label, len(self.frames), node, perf_counter())
+            self.events.append(event)
+
+        self.frames.append([path, 0.0, event])
+
+        for key in (name, op):
+            if key is not None:
+                self.active[key] = self.active.get(key, 0) + 1
+
+    def exit(self, node, elapsed: float):
+        path, child_time, event = self.frames.pop()
+        self_time = elapsed - child_time
+
+        if self.frames:
+            self.frames[-1][1] += elapsed
+        if event is not None:
+            event.elapsed = elapsed
+
+        self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+        name, op = self.keys(node)
+        self.record(self.node_types, name, elapsed, self_time)
+        if op is not None:
+            self.record(self.operators, op, elapsed, self_time)
+
+    @staticmethod
+    def keys(node) -> tuple[str, str | None]:
+        op = None
+        if isinstance(node, (BinOpNode, UnaryOpNode)):
+            op = f"{type(node).__name__}({node.op_tok.type})"
+        return type(node).__name__, op
+
+    def record(self, table: dict[str, ProfileEntry], key: str, elapsed, self_time):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = ProfileEntry()
+
+        entry.count += 1
+        entry.self_time += self_time
+
+        self.active[key] -= 1
+        if not self.active[key]:
+            entry.total_time += elapsed
+
+    def reset(self):
+        self.node_types.clear()
+        self.operators.clear()
+        self.stacks.clear()
+        self.events.clear()
+        self.frames.clear()
+        self.active.clear()
+
+    def export_flat(self) -> str:
+        lines = [f"{'name':<24} {'calls':>10} {'total ms':>12} {'self ms':>12}"]
+
+        for title, table in (("node", self.node_types), ("operator", self.operators)):
+            lines.append(f"-- by {title}")
+            for key, entry in sorted(
+                table.items(), key=lambda item: item[1].self_time, reverse=True
+            ):
+                lines.append(
+                    f"{key:<24} {entry.count:>10} {entry.total_time * 1000:>12.3f} "
+                    f"{entry.self_time * 1000:>12.3f}"
+                )
+
+        return "\n".join(lines)
+
+    def export_folded(self) -> str:
+        """Self time per call stack in microseconds, as `frame;frame count` lines."""
+        return "\n".join(
+            f"{path} {max(round(seconds * 1e6), 1)}"
+            for path, seconds in sorted(self.stacks.items())
+        )
+
+    def write_folded(self, path: str):
+        with open(path, "w") as file:
+            file.write(self.export_folded() + "\n")
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from src.closure import ClosureCompiler
+from src.compiler import Compiler
+from src.interpreter import Context, Interpreter, RunTimeResult
+from src.profiler import Instrument
+from src.lexer import Lexer
+from src.limits import start_budget
+from src.optimizer import Optimizer
+from src.parser import Parser
+from src.source import SourceFile
+from src.vm import VM
+
+ENGINES = ("interpreter", "vm", "closure")
+
+
+class Program:
+    def __init__(self, node) -> None:
+        self.node = node
+
+        # Compiled forms are built the first time an engine runs the program.
+        # Two threads racing here both build the same thing, so no lock needed
+        self.chunk = None
+        self.closure = None
+        self.counted_closure = None
+
+    def execute(
+        self,
+        context: Context,
+        engine: str = "interpreter",
+        instrument: Instrument | None = None,
+    ) -> RunTimeResult:
+        if engine == "interpreter":
+            budget = start_budget(context.limits)
+            return Interpreter(instrument, budget).visit(self.node, context)
+
+        if instrument is not None:
+            raise ValueError("Only the interpreter engine supports instrumentation")
+
+        if engine == "vm":
+            if self.chunk is None:
+                self.chunk = Compiler().compile(self.node)
+            return VM().run(self.chunk, context)
+
+        if engine == "closure":
+            if context.limits is not None and context.limits.counts_steps:
+                if self.counted_closure is None:
+                    compiler = ClosureCompiler(counts_steps=True)
+                    self.counted_closure = compiler.compile(self.node)
+                return self.counted_closure(context)
+
+            if self.closure is None:
+                self.closure = ClosureCompiler().compile(self.node)
+            return self.closure(context)
+
+        raise ValueError(f"Unknown engine {engine!r}")
+
+
+def compile_program(text: str, fn: str, optimize: bool = True):
+    return compile_source(SourceFile(fn, text), optimize)
+
+
+def compile_source(source: SourceFile, optimize: bool = True):
+    lexer = Lexer(source.name, source.text, source)
+    tokens = lexer.generate_tokens()
+    ast = Parser(tokens).parse()
+
+    if ast.error:
+        # An illegal character anywhere in the input takes priority
+        for _ in tokens:
+            pass
+
+    if lexer.error:
+        return None, lexer.error
+    if ast.error:
+        return None, ast.error
+
+    node = ast.node
+    if optimize:
+        node = Optimizer().visit(node)
+
+    return Program(node), None
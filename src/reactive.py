@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from src.error import CycleError, Error, InvalidSyntaxError
+from src.nodes import VarAccessNode, VarAssignNode, postorder
+from src.program import Program
+from src.session import Session
+from src.values import Number
+
+
+class Definition:
+    """A `var name = ...` statement and the variables it reads and writes."""
+
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        self.name = str(program.node.var_name_tok.value)
+
+        # The first node reading each variable, for error positions. Reads
+        # of a variable the definition itself assigned earlier don't count.
+        self.reads: dict[str, VarAccessNode] = {}
+        self.writes: list[str] = []
+
+        for node in postorder(program.node):
+            if isinstance(node, VarAccessNode):
+                name = str(node.var_name_tok.value)
+                if name not in self.writes:
+                    self.reads.setdefault(name, node)
+            elif isinstance(node, VarAssignNode):
+                self.writes.append(str(node.var_name_tok.value))
+
+
+class Update:
+    def __init__(self) -> None:
+        # Definitions run, by name, in the order they ran
+        self.values: dict[str, Number] = {}
+        self.errors: dict[str, Error] = {}
+        # Definitions not run because something they read failed
+        self.skipped: list[str] = []
+
+
+class Reactive:
+    """
+    Keeps `var` definitions in a session like spreadsheet cells. Changing a
+    variable, or redefining one, runs again only the definitions that
+    depend on it, each after everything it reads.
+    """
+
+    def __init__(self, session: Session | None = None, engine: str = "interpreter"):
+        self.session = Session() if session is None else session
+        self.engine = engine
+
+        # The definition that assigns each variable
+        self.definitions: dict[str, Definition] = {}
+        # The definitions that read each variable
+        self.readers: dict[str, list[Definition]] = {}
+
+    def define(self, text: str, fn: str = "<cell>") -> tuple[Update, Error | None]:
+        program, error = self.session.compile(text, fn)
+        if error:
+            return Update(), error
+
+        node = program.node  # type: ignore
+        if not isinstance(node, VarAssignNode):
+            return Update(), InvalidSyntaxError(
+                "Expected a variable definition", node.pos_start, node.pos_end
+            )
+
+        definition = Definition(program)  # type: ignore
+        error = self.find_cycle(definition)
+        if error:
+            return Update(), error
+
+        for name in definition.writes:
+            self.remove(name)
+        self.definitions.update((name, definition) for name in definition.writes)
+        for name in definition.reads:
+            self.readers.setdefault(name, []).append(definition)
+
+        return self.recompute([definition], definition.writes), None
+
+    def set(self, name: str, value: int | float) -> Update:
+        """Binds a variable to a plain value, replacing any definition of it."""
+        self.remove(name)
+
+        with self.session.lock:
+            self.session.symbol_table.set(
+                name, Number(value).set_context(self.session.context)
+            )
+        return self.recompute([], [name])
+
+    def get(self, name: str):
+        return self.session.symbol_table.get(name)
+
+    def remove(self, name: str):
+        """Forgets the definition of a variable, keeping its current value."""
+        definition = self.definitions.get(name)
+        if definition is None:
+            return
+
+        for written in definition.writes:
+            if self.definitions.get(written) is definition:
+                del self.definitions[written]
+        for read in definition.reads:
+            self.readers[read].remove(definition)
+
+    def dependents(self, names: list[str]) -> list[Definition]:
+        """Every definition that reads one of the names, directly or not."""
+        found: dict[int, Definition] = {}
+        pending = list(names)
+
+        while pending:
+            for definition in self.readers.get(pending.pop(), ()):
+                if id(definition) not in found:
+                    found[id(definition)] = definition
+                    pending.extend(definition.writes)
+
+        return list(found.values())
+
+    def order(self, definitions: list[Definition]) -> list[Definition]:
+        """Sorts definitions so each comes after the ones it reads from."""
+        waiting = {id(definition): 0 for definition in definitions}
+        readers: dict[int, list[Definition]] = {key: [] for key in waiting}
+
+        for definition in definitions:
+            for name in definition.reads:
+                source = self.definitions.get(name)
+                if source is not None and id(source) in waiting:
+                    waiting[id(definition)] += 1
+                    readers[id(source)].append(definition)
+
+        ready = [item for item in definitions if not waiting[id(item)]]
+        ordered = []
+        while ready:
+            definition = ready.pop()
+            ordered.append(definition)
+            for reader in readers[id(definition)]:
+                waiting[id(reader)] -= 1
+                if not waiting[id(reader)]:
+                    ready.append(reader)
+
+        return ordered
+
+    def recompute(self, changed: list[Definition], names: list[str]) -> Update:
+        affected = {id(definition): definition for definition in changed}
+        for definition in self.dependents(names):
+            affected.setdefault(id(definition), definition)
+
+        update = Update()
+        failed: set[str] = set()
+
+        for definition in self.order(list(affected.values())):
+            if any(name in failed for name in definition.reads):
+                update.skipped.append(definition.name)
+                failed.update(definition.writes)
+                continue
+
+            value, error = self.session.execute(definition.program, self.engine)
+            if error:
+                update.errors[definition.name] = error
+                failed.update(definition.writes)
+            else:
+                update.values[definition.name] = value
+
+        return update
+
+    def find_cycle(self, definition: Definition) -> CycleError | None:
+        """
+        Looks for a chain of definitions that leads from what this one reads
+        back to what it writes. Cycles are refused when defined, so the graph
+        can always be sorted.
+        """
+        targets = set(definition.writes)
+
+        for start, read in definition.reads.items():
+            # Depth-first, remembering how each variable was reached
+            came_from: dict[str, str | None] = {start: None}
+            stack = [start]
+
+            while stack:
+                name = stack.pop()
+                if name in targets:
+                    chain = [name]
+                    while came_from[chain[-1]] is not None:
+                        chain.append(came_from[chain[-1]])  # type: ignore
+                    chain.append(definition.name)
+                    return CycleError(
+                        f"{' -> '.join(reversed(chain))} refers back to itself",
+                        read.pos_start,
+                        read.pos_end,
+                    )
+
+                source = self.definitions.get(name)
+                if source is None:
+                    continue
+                for next_name in source.reads:
+                    if next_name not in came_from:
+                        came_from[next_name] = name
+                        stack.append(next_name)
+
+        return None
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from src.interpreter import SymbolTable
+from src.nodes import VarAccessNode, VarAssignNode, node_children
+
+# Marks a frame slot whose variable is not defined in the symbol table
+UNDEFINED = object()
+
+
+class Resolver:
+    """
+    Gives every variable a program reads or writes a fixed slot index, so
+    engines can load and store through a frame list instead of looking
+    names up in the SymbolTable chain on every access.
+    """
+
+    def resolve(self, node) -> dict[str, int]:
+        slots: dict[str, int] = {}
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, (VarAccessNode, VarAssignNode)):
+                slots.setdefault(str(node.var_name_tok.value), len(slots))
+
+            stack.extend(reversed(node_children(node)))
+
+        return slots
+
+
+def load_frame(names: list[str], symbol_table: SymbolTable) -> list:
+    """Reads the current raw value of each slot's variable."""
+    frame = []
+    for name in names:
+        value = symbol_table.get(name)
+        frame.append(value.value if value else UNDEFINED)
+    return frame
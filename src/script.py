@@ -0,0 +1,150 @@
+"""Runs scripts of one statement per line, from files or streams."""
+from __future__ import annotations
+
+import mmap
+from typing import BinaryIO, Iterator, TextIO
+
+from src.program import compile_source
+from src.session import Session
+from src.source import SourceFile
+
+BLOCK_SIZE = 1 << 20
+# Output is written in batches of this many lines
+FLUSH_EVERY = 4096
+# Distinct statements kept compiled, generated scripts repeat a lot of them
+COMPILED_LIMIT = 4096
+
+
+def mapped_lines(path: str) -> Iterator[bytes]:
+    """Yields the lines of a file through a memory map, one copy per line."""
+    with open(path, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+
+        with data:
+            start = 0
+            end = len(data)
+            while start < end:
+                newline = data.find(b"\n", start)
+                if newline < 0:
+                    newline = end
+                yield data[start:newline]
+                start = newline + 1
+
+
+def stream_lines(stream: BinaryIO, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yields the lines of a binary stream, reading it in large blocks."""
+    # The unfinished line, kept in pieces so a long one is joined only once
+    pending: list[bytes] = []
+    while block := stream.read(block_size):
+        lines = block.split(b"\n")
+        if len(lines) > 1:
+            pending.append(lines[0])
+            yield b"".join(pending)
+            yield from lines[1:-1]
+            pending = []
+        pending.append(lines[-1])
+
+    tail = b"".join(pending)
+    if tail:
+        yield tail
+
+
+class ScriptReport:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.errors: list[str] = []
+        # Whether the run ended early because of an error
+        self.stopped = False
+
+
+def run_lines(
+    lines: Iterator[bytes],
+    fn: str,
+    out: TextIO,
+    session: Session | None = None,
+    engine: str = "interpreter",
+    keep_going: bool = False,
+    optimize: bool = True,
+) -> ScriptReport:
+    """
+    Runs each non-blank line as a statement in one session, writing values
+    and errors to `out` in the same form as the interactive shell. Stops at
+    the first error unless `keep_going` is set.
+    """
+    session = Session() if session is None else session
+    report = ScriptReport()
+    output: list[str] = []
+    compiled: dict[str, tuple] = {}
+
+    try:
+        for ln, raw in enumerate(lines):
+            try:
+                text = raw.decode().rstrip("\r")
+            except UnicodeDecodeError as e:
+                text = None
+                message = f'File "{fn}", line {ln + 1}: not valid UTF-8 ({e.reason})'
+            else:
+                if not text.strip():
+                    continue
+
+            report.statements += 1
+            value = None
+            if text is not None:
+                try:
+                    value, message = run_line(
+                        compiled, text, fn, ln, session, engine, optimize
+                    )
+                except Exception as e:
+                    # Reported like any other error, so earlier output is
+                    # kept and --keep-going carries on past it
+                    message = f'File "{fn}", line {ln + 1}: {type(e).__name__}: {e}'
+
+            if message:
+                report.errors.append(message)
+                output.append(message + "\n")
+            if value:
+                output.append(f"{value}\n")
+
+            if message and not keep_going:
+                report.stopped = True
+                break
+            if len(output) >= FLUSH_EVERY:
+                out.write("".join(output))
+                output.clear()
+    finally:
+        out.write("".join(output))
+        out.flush()
+
+    return report
+
+
+def run_line(
+    compiled: dict[str, tuple],
+    text: str,
+    fn: str,
+    ln: int,
+    session: Session,
+    engine: str,
+    optimize: bool,
+):
+    """Runs one statement, returning its value and rendered error."""
+    cached = compiled.get(text)
+    if cached is None:
+        source = SourceFile(fn, text, ln)
+        if len(compiled) >= COMPILED_LIMIT:
+            compiled.clear()
+        compiled[text] = cached = (source, *compile_source(source, optimize))
+
+    source, program, error = cached
+    # Repeated statements share a source, errors are rendered before the
+    # next line moves it, so they report the right line number
+    source.line_base = ln
+    value = None
+    if program is not None:
+        value, error = session.execute(program, engine)
+
+    return value, error.as_string() if error else None
@@ -0,0 +1,139 @@
+"""
+Serves evaluations over a local socket.
+
+    python -m src.server [--host 127.0.0.1] [--port 8765] [--unix PATH]
+
+Each request is one line of JSON, `{"id": ..., "text": "...", "engine": "vm"}`,
+answered by one line `{"id": ..., "value": ..., "error": ...}` where exactly
+one of value and error is set. Every connection has its own variables, and
+its requests are answered in the order they were sent, so clients may
+pipeline as many as they like.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import ProgramCache
+from src.program import ENGINES
+from src.session import Session
+
+# Requests read ahead of the one being evaluated, per connection. Once this
+# many are waiting the server stops reading and the socket pushes back.
+PIPELINE_DEPTH = 64
+MAX_LINE = 1 << 20
+
+
+class Server:
+    def __init__(self, workers: int | None = None, cache_size: int = 1024) -> None:
+        self.cache = ProgramCache(cache_size)
+        self.executor = ThreadPoolExecutor(workers)
+        self.connections = 0
+
+    def evaluate(self, session: Session, request: dict) -> dict:
+        engine = request.get("engine", "interpreter")
+        if engine not in ENGINES:
+            return {"value": None, "error": f"Unknown engine {engine!r}"}
+
+        try:
+            value, error = session.run(str(request["text"]), "<remote>", engine)
+        except Exception as e:
+            # A crash in one evaluation must not take the connection down
+            # with it, later pipelined requests are still waiting
+            return {"value": None, "error": f"{type(e).__name__}: {e}"}
+
+        if error:
+            return {"value": None, "error": error.as_string()}
+        return {"value": value.value if value else None, "error": None}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = Session(self.cache)
+        queue: asyncio.Queue = asyncio.Queue(PIPELINE_DEPTH)
+        self.connections += 1
+
+        respond = asyncio.create_task(self.respond(session, queue, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than MAX_LINE; the connection can't be resynced
+                    await queue.put({"error": "Request too long"})
+                    break
+
+                if not line:
+                    break
+                if line.strip():
+                    await queue.put(line)
+        finally:
+            await queue.put(None)
+            await respond
+            self.connections -= 1
+            writer.close()
+
+    async def respond(
+        self, session: Session, queue: asyncio.Queue, writer: asyncio.StreamWriter
+    ):
+        loop = asyncio.get_running_loop()
+
+        while (line := await queue.get()) is not None:
+            if isinstance(line, dict):
+                response = {"id": None, "value": None, **line}
+            else:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict) or "text" not in request:
+                        raise ValueError("expected an object with a 'text' field")
+                except ValueError as e:
+                    response = {"id": None, "value": None, "error": f"Bad request: {e}"}
+                else:
+                    # Evaluation is CPU-bound, so keep it off the event loop
+                    result = await loop.run_in_executor(
+                        self.executor, self.evaluate, session, request
+                    )
+                    response = {"id": request.get("id"), **result}
+
+            writer.write(encode_response(response))
+            await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, path: str = None):
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(
+                self.handle, host, port, limit=MAX_LINE
+            )
+
+        async with server:
+            await server.serve_forever()
+
+
+def encode_response(response: dict) -> bytes:
+    try:
+        return json.dumps(response).encode() + b"\n"
+    except (TypeError, ValueError) as e:
+        # Values JSON can't hold, like complex numbers or ints too long to
+        # print, still get an answer so the pipeline keeps moving
+        error = f"Result can't be sent as JSON: {e}"
+        response = {"id": response.get("id"), "value": None, "error": error}
+        return json.dumps(response).encode() + b"\n"
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m src.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket instead")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(Server(args.workers).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+
+from src.batch import evaluate_batch
+from src.cache import ProgramCache
+from src.diskcache import load_program
+from src.interpreter import Context, SymbolTable
+from src.limits import Limits
+from src.profiler import Instrument
+from src.program import Program, compile_program
+
+
+class Session:
+    """
+    An isolated evaluation environment with its own variables.
+
+    Sessions can share a ProgramCache, since compiled programs are never
+    mutated by running them. Runs within one session are serialized by its
+    lock, so a session may be shared between threads, but giving each thread
+    its own session lets evaluations run in parallel.
+    """
+
+    def __init__(
+        self,
+        cache: ProgramCache | None = None,
+        name: str = "<module>",
+        limits: Limits | None = None,
+    ) -> None:
+        self.symbol_table = SymbolTable()
+        self.symbol_table.set("null", 0)
+
+        self.context = Context(name)
+        self.context.symbol_table = self.symbol_table
+        # Sessions always cap integer sizes; steps and time are opt-in
+        self.context.limits = Limits() if limits is None else limits
+
+        self.cache = ProgramCache() if cache is None else cache
+        self.lock = threading.RLock()
+
+    def compile(self, text: str, fn: str, optimize: bool = True):
+        key = (text, fn, optimize)
+        program = self.cache.get(key)
+
+        if program is None:
+            program, error = compile_program(text, fn, optimize)
+            if error:
+                return None, error
+
+            self.cache.put(key, program)
+
+        return program, None
+
+    def run(
+        self,
+        text: str,
+        fn: str,
+        engine: str = "interpreter",
+        optimize: bool = True,
+        instrument: Instrument | None = None,
+    ):
+        program, error = self.compile(text, fn, optimize)
+        if error:
+            return [], error
+
+        return self.execute(program, engine, instrument)
+
+    def execute(
+        self,
+        program: Program,
+        engine: str = "interpreter",
+        instrument: Instrument | None = None,
+    ):
+        with self.lock:
+            res = program.execute(self.context, engine, instrument)
+
+        return res.value, res.error
+
+    def run_batch(self, text: str, fn: str, columns: dict, optimize: bool = True):
+        program, error = self.compile(text, fn, optimize)
+        if error:
+            return None, error
+
+        with self.lock:
+            return evaluate_batch(program.node, columns, self.context)
+
+    def run_file(
+        self,
+        path: str,
+        engine: str = "interpreter",
+        optimize: bool = True,
+        cache_dir: str | None = None,
+    ):
+        program, error = load_program(path, optimize, cache_dir)
+        if error:
+            return [], error
+
+        return self.execute(program, engine)
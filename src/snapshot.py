@@ -0,0 +1,326 @@
+"""
+Snapshots of a session's variables and compiled programs, so a new process
+can start warm. The file is memory mapped and nothing is decoded up front:
+a variable becomes a Number on its first lookup and a program is rebuilt
+from its flat AST on its first compile, so restoring costs in proportion
+to what is actually used.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from src.cache import ProgramCache
+from src.diskcache import dump_node, load_node
+from src.interpreter import Context, SymbolTable
+from src.limits import Limits
+from src.program import Program
+from src.session import Session
+from src.values import Number
+
+MAGIC = b"BSN\x00"
+FORMAT_VERSION = 1
+
+# magic, byte order, version, then the offset of each section
+HEADER = struct.Struct("=4sBxxxI4x6Q")
+BYTE_ORDER = {"little": 0, "big": 1}[sys.byteorder]
+
+FLOAT, INT, BIG_INT = range(3)
+# Stored without a Number around it, like the `null` every session defines
+RAW = 0x80
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def align(data: bytes) -> bytes:
+    return data + bytes(-len(data) % 8)
+
+
+def pack_table(items: list[bytes]) -> bytes:
+    """A count, the offset of each item plus the end, then the items."""
+    offsets = array("Q", [0])
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+
+    header = struct.pack("=Q", len(items)) + offsets.tobytes()
+    return align(header + b"".join(items))
+
+
+class PackedTable:
+    """A table written by `pack_table`, read in place from a buffer."""
+
+    def __init__(self, buffer: memoryview, offset: int) -> None:
+        (self.count,) = struct.unpack_from("=Q", buffer, offset)
+
+        start = offset + 8
+        self.data = start + 8 * (self.count + 1)
+        self.offsets = buffer[start : self.data].cast("Q")
+        self.buffer = buffer
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> memoryview:
+        start = self.data + self.offsets[i]
+        return self.buffer[start : self.data + self.offsets[i + 1]]
+
+    def find(self, key: bytes) -> int:
+        """The index of `key` in a table of sorted items, or -1."""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            item = bytes(self[mid])
+            if item < key:
+                low = mid + 1
+            elif item > key:
+                high = mid
+            else:
+                return mid
+
+        return -1
+
+
+def program_key(key: tuple) -> bytes:
+    text, fn, optimize = key
+    return b"%d\0%s\0%s" % (optimize, fn.encode(), text.encode())
+
+
+class Snapshot:
+    """An open snapshot file, mapped for as long as anything reads from it."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a snapshot")
+
+        magic, byte_order, version, *sections = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {version}")
+        if byte_order != BYTE_ORDER:
+            raise ValueError(f"{path} was written with a different byte order")
+
+        buffer = memoryview(data)
+        names, kinds, slots, big_ints, program_keys, program_nodes = sections
+
+        self.names = PackedTable(buffer, names)
+        self.kinds = buffer[kinds : kinds + len(self.names)]
+        self.ints = buffer[slots : slots + 8 * len(self.names)].cast("q")
+        self.floats = buffer[slots : slots + 8 * len(self.names)].cast("d")
+        self.big_ints = PackedTable(buffer, big_ints)
+
+        self.program_keys = PackedTable(buffer, program_keys)
+        self.program_nodes = PackedTable(buffer, program_nodes)
+
+    def value(self, i: int, context: Context | None = None):
+        kind = self.kinds[i]
+        if kind & ~RAW == FLOAT:
+            value = self.floats[i]
+        elif kind & ~RAW == INT:
+            value = self.ints[i]
+        else:
+            data = self.big_ints[self.ints[i]]
+            value = int.from_bytes(data, sys.byteorder, signed=True)
+
+        if kind & RAW:
+            return value
+        return Number(value).set_context(context)
+
+    def lookup(self, name: str, context: Context | None = None):
+        i = self.names.find(name.encode())
+        return None if i < 0 else self.value(i, context)
+
+    def symbols(self, context: Context | None = None):
+        for i in range(len(self.names)):
+            yield bytes(self.names[i]).decode(), self.value(i, context)
+
+    def program(self, key: tuple) -> Program | None:
+        i = self.program_keys.find(program_key(key))
+        if i < 0:
+            return None
+
+        text, fn, _ = key
+        return Program(load_node(bytes(self.program_nodes[i]), fn, text))
+
+    def programs(self):
+        """Every stored program as its encoded key and undecoded flat AST."""
+        for i in range(len(self.program_keys)):
+            yield bytes(self.program_keys[i]), bytes(self.program_nodes[i])
+
+
+class SnapshotTable(SymbolTable):
+    """
+    A symbol table backed by a snapshot. Values are decoded on their first
+    lookup and kept, and assignments shadow the stored values.
+    """
+
+    def __init__(self, snapshot: Snapshot, context: Context | None = None) -> None:
+        super().__init__()
+        self.snapshot = snapshot
+        self.context = context
+
+    def get(self, name: str):
+        value = self.symbols.get(name, None)
+        if value is None:
+            value = self.snapshot.lookup(name, self.context)
+            if value is not None:
+                self.symbols[name] = value
+
+        return value
+
+    def items(self) -> dict:
+        symbols = dict(self.snapshot.symbols(self.context))
+        symbols.update(self.symbols)
+        return symbols
+
+
+class SnapshotCache(ProgramCache):
+    """A program cache that rebuilds programs missing from it from a snapshot."""
+
+    def __init__(self, snapshot: Snapshot, maxsize: int = 128) -> None:
+        super().__init__(maxsize)
+        self.snapshot = snapshot
+        # Programs rebuilt from the snapshot, counted apart from the misses
+        self.restored = 0
+
+    def get(self, key: tuple) -> Program | None:
+        program = super().get(key)
+        if program is None:
+            program = self.snapshot.program(key)
+            if program is not None:
+                with self.lock:
+                    self.misses -= 1
+                    self.restored += 1
+                self.put(key, program)
+
+        return program
+
+    def stats(self) -> dict[str, int]:
+        stats = super().stats()
+        with self.lock:
+            stats["restored"] = self.restored
+        return stats
+
+
+def session_symbols(session: Session) -> dict:
+    tables = []
+    table = session.symbol_table
+    while table:
+        tables.append(table)
+        table = table.parent
+
+    # Outer tables first, so inner assignments win
+    symbols = {}
+    for table in reversed(tables):
+        if isinstance(table, SnapshotTable):
+            symbols.update(table.items())
+        else:
+            symbols.update(table.symbols)
+
+    return symbols
+
+
+def session_programs(session: Session) -> dict[bytes, bytes]:
+    programs = {}
+    if isinstance(session.cache, SnapshotCache):
+        programs.update(session.cache.snapshot.programs())
+
+    with session.cache.lock:
+        cached = list(session.cache.programs.items())
+    for key, program in cached:
+        programs[program_key(key)] = dump_node(program.node)
+
+    return programs
+
+
+def save_snapshot(session: Session, path: str):
+    """Writes the session's variables and compiled programs to `path`."""
+    with session.lock:
+        symbols = session_symbols(session)
+    programs = session_programs(session)
+
+    names = sorted(name.encode() for name in symbols)
+    kinds = bytearray()
+    # One 8-byte slot per variable, holding a float, an int or an index
+    # into the big ints
+    slots = bytearray()
+    big_ints: list[bytes] = []
+
+    for name in names:
+        value = symbols[name.decode()]
+        raw = RAW if not isinstance(value, Number) else 0
+        if not raw:
+            value = value.value
+
+        if type(value) not in (int, float):
+            # Like the complex result of `(0-8)^0.5`
+            raise ValueError(
+                f"Can't snapshot {name.decode()}, a {type(value).__name__} value"
+            )
+
+        if isinstance(value, float):
+            kinds.append(FLOAT | raw)
+            slots += struct.pack("=d", value)
+        elif INT64_MIN <= value <= INT64_MAX:
+            kinds.append(INT | raw)
+            slots += struct.pack("=q", value)
+        else:
+            kinds.append(BIG_INT | raw)
+            slots += struct.pack("=q", len(big_ints))
+            length = (value.bit_length() + 8) // 8
+            big_ints.append(value.to_bytes(length, sys.byteorder, signed=True))
+
+    keys = sorted(programs)
+    sections = [
+        pack_table(names),
+        align(bytes(kinds)),
+        bytes(slots),
+        pack_table(big_ints),
+        pack_table(keys),
+        pack_table([programs[key] for key in keys]),
+    ]
+
+    offsets = []
+    offset = HEADER.size
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+
+    header = HEADER.pack(MAGIC, BYTE_ORDER, FORMAT_VERSION, *offsets)
+
+    # Written to a private file and renamed into place, so a process starting
+    # from the snapshot never maps a half-written one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(header)
+            for section in sections:
+                file.write(section)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(
+    path: str,
+    name: str = "<module>",
+    limits: Limits | None = None,
+    cache_size: int = 128,
+) -> Session:
+    """
+    Starts a session from a snapshot. Its variables and programs are read
+    from the mapped file as they are needed.
+    """
+    snapshot = Snapshot(path)
+    session = Session(SnapshotCache(snapshot, cache_size), name, limits)
+    session.symbol_table.parent = SnapshotTable(snapshot, session.context)
+    return session
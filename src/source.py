@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+
+
+class SourceFile:
+    """
+    The name and text of one input, shared by every token and position
+    taken from it. Line and column lookups binary search an index of line
+    start offsets, built the first time one is needed.
+    """
+
+    __slots__ = ("name", "text", "line_base", "_line_starts")
+
+    def __init__(self, name: str, text: str, line_base: int = 0) -> None:
+        self.name = name
+        self.text = text
+        # Line number of the first line, for text taken from a larger document
+        self.line_base = line_base
+        self._line_starts: list[int] | None = None
+
+    @property
+    def line_starts(self) -> list[int]:
+        if self._line_starts is None:
+            text = self.text
+            starts = [0]
+            idx = text.find("\n")
+            while idx >= 0:
+                starts.append(idx + 1)
+                idx = text.find("\n", idx + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_number(self, idx: int) -> int:
+        return bisect_right(self.line_starts, max(idx, 0)) - 1
+
+    def line_col(self, idx: int) -> tuple[int, int]:
+        ln = self.line_number(idx)
+        return ln, max(idx, 0) - self.line_starts[ln]
+
+    def line(self, ln: int) -> str:
+        starts = self.line_starts
+        end = starts[ln + 1] - 1 if ln + 1 < len(starts) else len(self.text)
+        return self.text[starts[ln] : end]
+
+    def snippet(self, idx_start: int, idx_end: int) -> str:
+        """The lines spanning the two offsets, each underlined with carets."""
+        ln_start, col_start = self.line_col(idx_start)
+        ln_end, col_end = self.line_col(idx_end)
+
+        parts = []
+        for ln in range(ln_start, ln_end + 1):
+            line = self.line(ln)
+            start = col_start if ln == ln_start else 0
+            end = col_end if ln == ln_end else len(line) - 1
+
+            parts.append(line)
+            parts.append(" " * start + "^" * (end - start))
+
+        return "\n".join(parts).replace("\t", "")
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from src.position import Position
+from src.source import SourceFile
 
 KEYWORDS = ["var", "let"]
 
@@ -29,6 +30,8 @@ class TokenType:
 
 
 class Token:
+    __slots__ = ("type", "value", "idx_start", "idx_end", "source")
+
     def __init__(
         self,
         type_: TokenType,
@@ -39,10 +42,39 @@ class Token:
         self.type = type_
         self.value = value
 
+        # Only integer offsets are kept, positions are built on demand
+        self.idx_start = self.idx_end = -1
+        self.source: SourceFile = None  # type: ignore
+
         if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+            self.idx_start = pos_start.idx
+            self.idx_end = pos_end.idx if pos_end else pos_start.idx + 1
+            self.source = pos_start.source
+
+    @classmethod
+    def from_span(
+        cls,
+        type_: TokenType,
+        value: str | int | float | None,
+        idx_start: int,
+        idx_end: int,
+        source: SourceFile,
+    ):
+        tok = cls.__new__(cls)
+        tok.type = type_
+        tok.value = value
+        tok.idx_start = idx_start
+        tok.idx_end = idx_end
+        tok.source = source
+        return tok
+
+    @property
+    def pos_start(self) -> Position:
+        return Position(self.idx_start, self.source)
+
+    @property
+    def pos_end(self) -> Position:
+        return Position(self.idx_end, self.source)
 
     def matches(self, type_: TokenType, value: str | int | float | None = None) -> bool:
         return self.type == type_ and self.value == value
@@ -3,6 +3,8 @@ from src.position import Position
 
 
 class Number:
+    __slots__ = ("value", "pos_start", "pos_end", "context")
+
     def __init__(self, value: float | int):
         self.value = value
         self.set_pos()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+
+from src.compiler import Chunk, OpCode
+from src.error import LimitExceededError, RTError
+from src.interpreter import Context, RunTimeResult
+from src.limits import start_budget
+from src.resolver import UNDEFINED, load_frame
+from src.values import Number
+
+LOAD_CONST = OpCode.LOAD_CONST
+LOAD_SLOT = OpCode.LOAD_SLOT
+STORE_SLOT = OpCode.STORE_SLOT
+BINARY_ADD = OpCode.BINARY_ADD
+BINARY_SUB = OpCode.BINARY_SUB
+BINARY_MUL = OpCode.BINARY_MUL
+BINARY_DIV = OpCode.BINARY_DIV
+BINARY_POW = OpCode.BINARY_POW
+UNARY_NEG = OpCode.UNARY_NEG
+LOAD_TEMP = OpCode.LOAD_TEMP
+STORE_TEMP = OpCode.STORE_TEMP
+
+
+class VM:
+    def run(self, chunk: Chunk, context: Context):
+        res = RunTimeResult()
+
+        code = chunk.code
+        constants = chunk.constants
+        names = chunk.names
+        symbol_table = context.symbol_table
+        frame = load_frame(names, symbol_table)
+        if chunk.temps:
+            frame.extend([None] * chunk.temps)
+
+        stack: list[int | float] = []
+        push = stack.append
+        pop = stack.pop
+
+        budget = start_budget(context.limits)
+        max_int_bits = None if budget is None else budget.max_int_bits
+
+        ip = 0
+        end = len(code)
+        # Limits are checked between segments, so the loop itself stays free
+        # of step counting. A segment stops before the instruction whose
+        # nodes reach the next check, so crossing the step limit is caught
+        # before that instruction runs, even in the last segment.
+        steps = chunk.steps
+        segment_end = end
+        if budget is not None and budget.counts_steps:
+            segment_end = min(end, bisect_left(steps, budget.next_check) << 1)
+
+        while True:
+            while ip < segment_end:
+                op = code[ip]
+                arg = code[ip + 1]
+                ip += 2
+
+                if op == LOAD_CONST:
+                    push(constants[arg])
+                elif op == LOAD_SLOT:
+                    value = frame[arg]
+                    if value is UNDEFINED:
+                        return res.failure(
+                            self.error(
+                                f"{names[arg]} is not defined", chunk, ip, context
+                            )
+                        )
+                    push(value)
+                elif op == BINARY_ADD:
+                    right = pop()
+                    stack[-1] += right
+                elif op == BINARY_SUB:
+                    right = pop()
+                    stack[-1] -= right
+                elif op == BINARY_MUL:
+                    right = pop()
+                    if max_int_bits is not None:
+                        details = budget.check_mul(stack[-1], right)  # type: ignore
+                        if details:
+                            return res.failure(
+                                self.error(details, chunk, ip, context, True)
+                            )
+                    stack[-1] *= right
+                elif op == BINARY_DIV:
+                    right = pop()
+                    if right == 0:
+                        return res.failure(
+                            self.error("Division by zero", chunk, ip, context)
+                        )
+                    stack[-1] /= right
+                elif op == BINARY_POW:
+                    right = pop()
+                    if max_int_bits is not None:
+                        details = budget.check_pow(stack[-1], right)  # type: ignore
+                        if details:
+                            return res.failure(
+                                self.error(details, chunk, ip, context, True)
+                            )
+                    stack[-1] **= right
+                elif op == UNARY_NEG:
+                    stack[-1] = -stack[-1]
+                elif op == LOAD_TEMP:
+                    push(frame[arg])
+                elif op == STORE_TEMP:
+                    frame[arg] = stack[-1]
+                elif op == STORE_SLOT:
+                    frame[arg] = stack[-1]
+                    # Stores also go through to the symbol table, which stays
+                    # the source of truth between runs
+                    pos_start, pos_end = chunk.positions[(ip >> 1) - 1]  # type: ignore
+                    symbol_table.set(
+                        names[arg],
+                        Number(stack[-1])
+                        .set_context(context)
+                        .set_pos(pos_start, pos_end),
+                    )
+                else:
+                    raise Exception(f"Unknown opcode {op}")
+
+            if ip >= end:
+                break
+
+            budget.steps = steps[ip >> 1]  # type: ignore
+            details = budget.check()  # type: ignore
+            if details:
+                return res.failure(self.error(details, chunk, ip + 2, context, True))
+            next_check = budget.next_check  # type: ignore
+            segment_end = min(end, bisect_left(steps, next_check) << 1)
+
+        return res.success(
+            Number(pop()).set_context(context).set_pos(chunk.pos_start, chunk.pos_end)
+        )
+
+    @staticmethod
+    def error(
+        details: str, chunk: Chunk, ip: int, context: Context, limit: bool = False
+    ):
+        # `ip` has already moved past the failing instruction
+        span = chunk.positions[(ip >> 1) - 1] or (chunk.pos_start, chunk.pos_end)
+        if limit:
+            return LimitExceededError(details, *span, context)
+        return RTError(details, *span, context)